@@ -1,6 +1,5 @@
 from flask import Flask, render_template, request, jsonify
 import os
-import json
 import re
 import random
 import nltk
@@ -10,6 +9,9 @@ from nltk.stem import WordNetLemmatizer
 import string
 from datetime import datetime
 from chatbot_gpt import GPTChatbot
+from knowledge_loader import load_knowledge, save_knowledge
+from conversation_log import ConversationLog, migrate_conversations
+from dedup_index import DedupIndex
 
 def main():
     print("Iniciando o Chatbot Sonho...")
@@ -33,21 +35,23 @@ except LookupError:
 
 # Classe de Base de Conhecimento
 class KnowledgeBase:
-    def __init__(self, file_path):
+    def __init__(self, file_path, conversation_log_path=None):
         self.file_path = file_path
         self.knowledge = self._load_knowledge()
         self.lemmatizer = WordNetLemmatizer()
+        if conversation_log_path is None:
+            conversation_log_path = os.path.splitext(file_path)[0] + "_conversations.jsonl"
+        self.conversation_log = ConversationLog(conversation_log_path)
+        # Versões anteriores guardavam as conversas no próprio arquivo de conhecimento
+        if migrate_conversations(self.knowledge, self.conversation_log):
+            self.save_knowledge()
+        # Hashes exatos indexados já na carga; assinaturas MinHash em segundo plano
+        self.dedup_index = DedupIndex.from_facts(
+            (topic, fact) for topic, facts in self.knowledge["facts"].items() for fact in facts)
 
     def _load_knowledge(self):
-        if os.path.exists(self.file_path):
-            try:
-                with open(self.file_path, 'r', encoding='utf-8') as file:
-                    knowledge = json.load(file)
-            except json.JSONDecodeError:
-                print("Arquivo corrompido. Criando novo.")
-                knowledge = self._create_empty_knowledge()
-        else:
-            knowledge = self._create_empty_knowledge()
+        # Carrega seção por seção; documentos e conversas só quando acessados
+        knowledge = load_knowledge(self.file_path, self._create_empty_knowledge())
 
         # Conversão de set para dict se necessário
         if isinstance(knowledge.get("vocabulary"), set):
@@ -62,23 +66,20 @@ class KnowledgeBase:
     def _create_empty_knowledge(self):
         return {
             "facts": {},
-            "conversations": [],
             "last_updated": str(datetime.now()),
             "relationships": {},
             "vocabulary": {}
         }
 
     def save_knowledge(self):
-        with open(self.file_path, 'w', encoding='utf-8') as file:
-            json.dump(self.knowledge, file, ensure_ascii=False, indent=4)
+        save_knowledge(self.knowledge, self.file_path)
 
     def add_fact(self, topic, information):
         topic = topic.lower().strip()
-        if topic not in self.knowledge["facts"]:
-            self.knowledge["facts"][topic] = []
 
-        if information not in self.knowledge["facts"][topic]:
-            self.knowledge["facts"][topic].append(information)
+        # Verificação e inserção no índice numa única operação, segura entre threads
+        if self.dedup_index.add_if_new(topic, information) is None:
+            self.knowledge["facts"].setdefault(topic, []).append(information)
             self._extract_keywords(topic, information)
             self.save_knowledge()
             return True
@@ -129,15 +130,13 @@ class KnowledgeBase:
         return results[:5]
 
     def add_conversation(self, user_input, ai_response):
-        if len(self.knowledge["conversations"]) >= 100:
-            self.knowledge["conversations"].pop(0)
-
-        self.knowledge["conversations"].append({
+        self.conversation_log.append({
             "user": user_input,
             "ai": ai_response
         })
 
-        self.save_knowledge()
+    def get_recent_conversations(self, count=5):
+        return self.conversation_log.get_recent_conversations(count)
 
 # Inicializa a base
 knowledge_base = KnowledgeBase('knowledge.json')
@@ -0,0 +1,232 @@
+# async_server.py - Modo de serviço assíncrono (ASGI) da aplicação principal
+#
+# Uso:
+#   python async_server.py
+#   hypercorn async_server:app --bind 0.0.0.0:5000
+#
+# As rotas são as mesmas de main.py, mas os handlers não bloqueiam o event
+# loop: geração, leitura de PDFs e escrita na base de conhecimento rodam em
+# executores dedicados, cada um com uma fila limitada. Quando a fila está
+# cheia a requisição recebe 503 com Retry-After em vez de esperar.
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+if __name__ == "__main__":
+    # Executado como script, este arquivo seria reimportado por cada processo
+    # de leitura de PDF (e com ele o modelo); o hypercorn importa o app como módulo
+    bind = os.environ.get("SONHO_BIND", "127.0.0.1:5000")
+    os.execv(sys.executable, [sys.executable, "-m", "hypercorn", "async_server:app", "--bind", bind])
+
+from quart import Quart, render_template, request, jsonify, send_from_directory, g
+from werkzeug.utils import secure_filename
+
+import main
+from metrics import registry, stage_seconds, span, start_trace, finish_trace, server_timing
+from text_processing import extract_pdf_pages_from_path
+from upload_store import describe
+
+
+class Overloaded(Exception):
+    def __init__(self, executor_name, retry_after):
+        super().__init__(f"Executor '{executor_name}' sobrecarregado")
+        self.executor_name = executor_name
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """Executor com limite de tarefas pendentes (em execução + na fila).
+
+    `run` recusa novas tarefas com `Overloaded` quando o limite é atingido.
+    A vaga só é liberada quando a tarefa termina no executor, mesmo que a
+    requisição seja cancelada antes (ex.: cliente desconectado).
+    O Retry-After sugerido estima quanto tempo a fila atual leva para esvaziar.
+    """
+
+    def __init__(self, name, executor, workers, max_queue):
+        self.name = name
+        self.executor = executor
+        self.workers = workers
+        self.max_pending = workers + max_queue
+        self.pending = 0
+        self._average = 1.0  # Média móvel da duração das tarefas, em segundos
+        self._lock = threading.Lock()
+        registry.gauge(f"sonho_executor_{name}_pending",
+                       f"Tarefas em execução ou na fila do executor '{name}'.",
+                       lambda: self.pending)
+
+    def retry_after(self):
+        return max(1, round(self._average * self.pending / self.workers))
+
+    async def run(self, function, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                overloads.inc(executor=self.name)
+                raise Overloaded(self.name, self.retry_after())
+            self.pending += 1
+        start = time.perf_counter()
+        call = functools.partial(function, *args)
+        if isinstance(self.executor, ThreadPoolExecutor):
+            # Propaga o contexto (rastreamento por requisição) para a thread
+            call = functools.partial(contextvars.copy_context().run, call)
+        try:
+            future = self.executor.submit(call)
+        except BaseException:
+            self._release(start)
+            raise
+        future.add_done_callback(lambda _: self._release(start))
+        return await asyncio.wrap_future(future)
+
+    def _release(self, start):
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.pending -= 1
+            self._average = 0.8 * self._average + 0.2 * elapsed
+
+
+overloads = registry.counter("sonho_overload_total", "Requisições recusadas por executor cheio.")
+
+GENERATION_WORKERS = int(os.environ.get("SONHO_GENERATION_WORKERS", 1))
+PDF_WORKERS = int(os.environ.get("SONHO_PDF_WORKERS", 2))
+MAX_QUEUE = int(os.environ.get("SONHO_MAX_QUEUE", 8))
+
+# Geração compartilha um único modelo; PDFs são lidos em processos separados,
+# iniciados com "spawn" para que carreguem só text_processing (e não herdem o
+# modelo nem as threads do servidor); escritas na base passam por uma única
+# thread, em ordem. Buscas e escritas são coordenadas pela trava da base.
+generation = BoundedExecutor("generation", ThreadPoolExecutor(GENERATION_WORKERS, "sonho-generation"),
+                             GENERATION_WORKERS, MAX_QUEUE)
+pdf_parsing = BoundedExecutor("pdf", ProcessPoolExecutor(PDF_WORKERS, mp_context=multiprocessing.get_context("spawn")),
+                              PDF_WORKERS, MAX_QUEUE)
+knowledge_writes = BoundedExecutor("knowledge", ThreadPoolExecutor(1, "sonho-knowledge"), 1, MAX_QUEUE)
+
+app = Quart(__name__)
+app.config['UPLOAD_FOLDER'] = main.UPLOAD_FOLDER
+
+
+def _overloaded(error):
+    response = jsonify({"response": "Servidor ocupado. Tente novamente em instantes."})
+    return response, 503, {'Retry-After': str(error.retry_after)}
+
+
+@app.before_serving
+async def load_model():
+    # Carrega o modelo antes de aceitar conexões, sem bloquear o event loop
+    await asyncio.get_running_loop().run_in_executor(None, main.get_chatbot)
+
+
+@app.after_serving
+async def shutdown_executors():
+    for bounded in (generation, pdf_parsing, knowledge_writes):
+        bounded.executor.shutdown(wait=False, cancel_futures=True)
+
+
+@app.before_request
+async def start_request_metrics():
+    main.requests_in_flight.inc()
+    g.start_time = time.perf_counter()
+    g.trace_token = start_trace() if request.headers.get(main.TRACE_HEADER) else None
+
+
+@app.after_request
+async def finish_request_metrics(response):
+    endpoint = request.endpoint or 'desconhecido'
+    elapsed = time.perf_counter() - g.start_time
+    main.http_requests.inc(endpoint=endpoint, status=response.status_code)
+    if endpoint != 'metrics':
+        stage_seconds.observe(elapsed, stage=f'request:{endpoint}')
+    if g.trace_token is not None:
+        trace = finish_trace(g.trace_token)
+        g.trace_token = None
+        trace.append(('total', elapsed))
+        response.headers['Server-Timing'] = server_timing(trace)
+    return response
+
+
+@app.teardown_request
+async def release_request_metrics(exception=None):
+    main.requests_in_flight.dec()
+    if g.get('trace_token') is not None:
+        finish_trace(g.trace_token)
+
+
+@app.route('/api/metrics')
+async def metrics():
+    return registry.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+@app.route('/')
+async def index():
+    return await render_template('index.html')
+
+
+@app.route('/api/chat', methods=['POST'])
+async def chat():
+    data = await request.get_json()
+    message = data.get('message', '').strip()
+
+    if not message:
+        return jsonify({"response": "Por favor, envie uma mensagem."})
+
+    chatbot = main.get_chatbot()
+    try:
+        # Comandos de aprendizado escrevem na base; o resto é geração
+        if message.lower().startswith("aprender:"):
+            response = await knowledge_writes.run(chatbot.process_command, message)
+        else:
+            response = await generation.run(chatbot.process_command, message)
+    except Overloaded as e:
+        return _overloaded(e)
+
+    return jsonify({"response": response})
+
+
+@app.route('/api/upload', methods=['POST'])
+async def upload_file():
+    files = await request.files
+    if 'file' not in files:
+        return jsonify({"response": "Nenhum arquivo enviado"})
+
+    file = files['file']
+    if file.filename == '':
+        return jsonify({"response": "Nenhum arquivo selecionado"})
+
+    filename = secure_filename(file.filename)
+    data = file.read()
+    store = main.upload_store
+    try:
+        sha256 = await knowledge_writes.run(store.save, data, filename)
+        if not filename.lower().endswith('.pdf'):
+            return jsonify({"response": f"Arquivo '{filename}' recebido, mas o formato não é suportado. Por favor, envie arquivos PDF."})
+
+        # Conteúdo que a base já incorporou não passa de novo pela extração nem pela base
+        result = await knowledge_writes.run(store.processed, sha256, main.knowledge_base)
+        if result is None:
+            with span("pdf_extract"):
+                pages = await pdf_parsing.run(extract_pdf_pages_from_path, store.blob_path(sha256, filename))
+            result = await knowledge_writes.run(store.index_pages, sha256, filename, pages, main.knowledge_base)
+        else:
+            result = dict(result, changed_pages=0, added_facts=0)
+    except Overloaded as e:
+        return _overloaded(e)
+    except Exception as e:
+        return jsonify({"response": f"Erro ao processar o PDF: {str(e)}"})
+
+    return jsonify({"response": describe(filename, result)})
+
+
+@app.route('/uploads/<filename>')
+async def uploaded_file(filename):
+    location = main.upload_store.resolve(secure_filename(filename))
+    if location is None:
+        return await send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    directory, blob_name = location
+    return await send_from_directory(directory, blob_name)
+
@@ -0,0 +1,70 @@
+# benchmarks/bench_calculation.py - Mede o motor de expressões compiladas
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculation_module import CalculationModule, np
+
+EXPRESSION = "sqrt(x^2 + y^2) * sin(x) + log(abs(y) + 1) % 7"
+N_BINDINGS = 1_000_000
+
+# Precedência de '^': potência, associativa à direita, acima de * e +
+PRECEDENCE_CASES = [
+    ("2*3^2", {}, 18),
+    ("1+2^2", {}, 5),
+    ("2^3^2", {}, 512),
+    ("-2^2", {}, -4),
+    ("sqrt(x^2 + y^2)", {"x": 3, "y": 4}, 5.0),
+]
+
+
+def check_precedence(calc):
+    for expression, variables, expected in PRECEDENCE_CASES:
+        result = calc.calculate_with_variables(expression, variables)
+        if result != expected:
+            raise AssertionError(f"{expression} = {result!r}, esperado {expected!r}")
+
+
+def bench_scalar(calc, n):
+    rng = random.Random(42)
+    bindings = [{"x": rng.uniform(-10, 10), "y": rng.uniform(-10, 10)} for _ in range(n)]
+    start = time.perf_counter()
+    for variables in bindings:
+        calc.calculate_with_variables(EXPRESSION, variables)
+    return time.perf_counter() - start
+
+
+def bench_vectorized(calc, n):
+    rng = np.random.default_rng(42)
+    x = rng.uniform(-10, 10, n)
+    y = rng.uniform(-10, 10, n)
+    start = time.perf_counter()
+    calc.evaluate_vectorized(EXPRESSION, {"x": x, "y": y})
+    return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N_BINDINGS
+    calc = CalculationModule()
+    check_precedence(calc)
+    print(f"Expressão: {EXPRESSION}")
+    print(f"Associações de variáveis: {n}")
+
+    elapsed = bench_scalar(calc, n)
+    print(f"Escalar:    {elapsed:.3f}s ({n / elapsed:,.0f} avaliações/s)")
+
+    if np is not None:
+        elapsed = bench_vectorized(calc, n)
+        print(f"Vetorizado: {elapsed:.3f}s ({n / elapsed:,.0f} avaliações/s)")
+    else:
+        print("Vetorizado: NumPy não instalado, ignorado.")
+
+    print(f"Cache: {calc.compile.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_knowledge_load.py - Compara json.load com o carregamento incremental
+
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORDS = ("sonho conhecimento aprender documento tópico frase exemplo "
+         "knowledge learning document topic sentence example").split()
+
+
+def make_fixture(path, size_mb):
+    """Gera um knowledge.json com documentos e conversas até ~size_mb megabytes."""
+    rng = random.Random(42)
+    paragraph = lambda n: " ".join(rng.choice(WORDS) for _ in range(n))
+    knowledge = {
+        "facts": {f"topico{i}": [paragraph(30)] for i in range(1000)},
+        "conversations": [{"user": paragraph(10), "ai": paragraph(20)} for _ in range(100)],
+        "documents": {},
+        "last_updated": "2024-01-01 00:00:00",
+        "vocabulary": {word: {"topics": [], "count": 1} for word in WORDS},
+    }
+    document = "\n\n".join(paragraph(200) for _ in range(100))
+    count = (size_mb * 1024 * 1024) // len(document.encode("utf-8")) + 1
+    for i in range(count):
+        knowledge["documents"][f"doc{i}.pdf"] = document
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(knowledge, file, ensure_ascii=False, indent=4)
+
+
+def measure(mode, path):
+    """Executado num subprocesso para medir o pico de memória isoladamente."""
+    start = time.perf_counter()
+    if mode == "json.load":
+        with open(path, "r", encoding="utf-8") as file:
+            knowledge = json.load(file)
+    else:
+        from knowledge_loader import load_knowledge
+        knowledge = load_knowledge(path, {})
+    elapsed = time.perf_counter() - start
+    facts = len(knowledge["facts"])
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"mode": mode, "seconds": elapsed, "peak_rss_mb": peak_kb / 1024, "facts": facts}))
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], sys.argv[3])
+        return
+
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 128
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "knowledge.json")
+        make_fixture(path, size_mb)
+        print(f"Fixture: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+        for mode in ("json.load", "load_knowledge"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--measure", mode, path],
+                capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:15s} {result['seconds']:.3f}s  pico RSS {result['peak_rss_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/bench_relationship_graph.py - Latência de expansão num grafo de 100k arestas
+
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relationship_graph import RelationshipGraph
+
+N_EDGES = 100_000
+N_TOPICS = 5_000
+N_WORDS = 20_000
+N_QUERIES = 500
+
+
+def build_graph(rng):
+    graph = RelationshipGraph()
+    # Distribuição de palavras enviesada, como num vocabulário real
+    words = [f"palavra{i}" for i in range(N_WORDS)]
+    cum_weights = list(itertools.accumulate(1.0 / (i + 1) for i in range(N_WORDS)))
+    while graph.edge_count < N_EDGES:
+        topic = f"topico{rng.randrange(N_TOPICS)}"
+        for word in rng.choices(words, cum_weights=cum_weights, k=20):
+            graph.add_edge(topic, word)
+    return graph
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def timed(func, queries):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        func(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    rng = random.Random(42)
+    start = time.perf_counter()
+    graph = build_graph(rng)
+    print(f"Grafo: {len(graph)} nós, {graph.edge_count} arestas "
+          f"({time.perf_counter() - start:.2f}s para construir)")
+
+    queries = [f"topico{rng.randrange(N_TOPICS)}" for _ in range(N_QUERIES)]
+    for label, func in (
+        ("BFS (2 saltos, 50 nós)", lambda q: graph.bfs(q, max_depth=2, max_nodes=50)),
+        ("PageRank personalizado", lambda q: graph.personalized_pagerank(q, top_k=10)),
+    ):
+        latencies = timed(func, queries)
+        print(f"{label:24s} p50 {percentile(latencies, 0.5):.2f} ms  "
+              f"p95 {percentile(latencies, 0.95):.2f} ms  max {max(latencies):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
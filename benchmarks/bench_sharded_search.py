@@ -0,0 +1,103 @@
+# benchmarks/bench_sharded_search.py - Latência de busca da base única e da particionada por tamanho
+#
+# Uso:
+#   python benchmarks/bench_sharded_search.py                 # 10k, 100k e 1M fatos
+#   python benchmarks/bench_sharded_search.py 1000 10000 --shards 4
+#
+# As duas bases recebem os mesmos fatos; a suíte verifica que elas devolvem
+# os mesmos resultados e mede p50/p95 por tamanho. A latência deve ficar
+# estável à medida que a base cresce.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import QUERIES, synthetic_facts
+from knowledge_store import KnowledgeBase
+from sharded_store import ShardedKnowledgeBase
+from text_processing import extract_keywords
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+ROUNDS = 50
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def populate(kb, facts):
+    """Preenche a base de uma vez, no mesmo formato de _insert_fact.
+
+    Sem o índice de duplicatas (os fatos sintéticos já são distintos) e com
+    as listas de tópicos do vocabulário ordenadas uma única vez no final.
+    """
+    vocabulary = {}
+    for topic, fact, keywords in facts:
+        kb.knowledge["facts"].setdefault(topic, []).append(fact)
+        for word in keywords:
+            entry = vocabulary.setdefault(word, {"topics": set(), "count": 0})
+            entry["topics"].add(topic)
+            entry["count"] += 1
+    for word, entry in vocabulary.items():
+        kb.knowledge["vocabulary"][word] = {"topics": sorted(entry["topics"]), "count": entry["count"]}
+
+
+def build(size, num_shards, directory):
+    facts = [(topic, fact, extract_keywords(fact)) for topic, fact in synthetic_facts(size)]
+    single = KnowledgeBase(os.path.join(directory, f"single_{size}.json"))
+    populate(single, facts)
+    sharded = ShardedKnowledgeBase(os.path.join(directory, f"shards_{size}"), num_shards)
+    by_shard = {}
+    for item in facts:
+        by_shard.setdefault(sharded.shard_for(item[0]), []).append(item)
+    for index, shard_facts in by_shard.items():
+        populate(sharded.shards[index], shard_facts)
+    sharded._count_words()
+    return single, sharded
+
+
+def measure(search, queries):
+    latencies = []
+    for _ in range(ROUNDS):
+        for query in queries:
+            start = time.perf_counter()
+            search(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência de busca por tamanho da base")
+    parser.add_argument("sizes", nargs="*", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--shards", type=int, default=8)
+    args = parser.parse_args()
+
+    queries = QUERIES["pt"] + QUERIES["en"] + ["café1", "music"]
+    p95_by_size = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            start = time.perf_counter()
+            single, sharded = build(size, args.shards, directory)
+            print(f"{size:>9,} fatos ({time.perf_counter() - start:.1f}s para construir)")
+
+            for query in queries:
+                if single.search_knowledge(query) != sharded.search_knowledge(query):
+                    raise AssertionError(f"Resultados diferentes para {query!r}")
+
+            for label, kb in (("única", single), (f"{args.shards} shards", sharded)):
+                latencies = measure(kb.search_knowledge, queries)
+                p95_by_size.setdefault(label, []).append(percentile(latencies, 0.95))
+                print(f"  {label:10s} p50 {percentile(latencies, 0.5):.3f} ms  "
+                      f"p95 {percentile(latencies, 0.95):.3f} ms  max {max(latencies):.3f} ms")
+
+    for label, values in p95_by_size.items():
+        print(f"p95 {label}: maior/menor tamanho = {values[-1] / values[0]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/fixtures.py - Geradores de dados sintéticos para os benchmarks
+
+import random
+
+PORTUGUESE_WORDS = (
+    "sonho conhecimento aprender documento frase exemplo gato almofada café "
+    "amigo conversa pergunta resposta contexto estrutura sujeito verbo "
+    "complemento variação ensino progressivo cidade história ciência música "
+    "computador linguagem memória tempo trabalho família escola viagem"
+).split()
+
+ENGLISH_WORDS = (
+    "dream knowledge learn document sentence example cat cushion coffee "
+    "friend conversation question answer context structure subject verb "
+    "complement variation teaching progressive city history science music "
+    "computer language memory time work family school travel"
+).split()
+
+QUERIES = {
+    "pt": ["o que é conhecimento", "fale sobre música", "história da cidade", "como aprender linguagem"],
+    "en": ["what is knowledge", "tell me about music", "history of the city", "how to learn a language"],
+}
+
+
+def sentence(rng, words, length):
+    text = " ".join(rng.choice(words) for _ in range(length))
+    return text[0].upper() + text[1:] + "."
+
+
+def paragraph(rng, words, sentences=4):
+    return " ".join(sentence(rng, words, rng.randint(6, 14)) for _ in range(sentences))
+
+
+def synthetic_facts(n_facts, seed=42):
+    """Gera `n_facts` pares (tópico, fato), metade em português e metade em inglês."""
+    rng = random.Random(seed)
+    facts = []
+    for i in range(n_facts):
+        words = PORTUGUESE_WORDS if i % 2 == 0 else ENGLISH_WORDS
+        topic = f"{rng.choice(words)}{rng.randrange(max(1, n_facts // 10))}"
+        facts.append((topic, paragraph(rng, words, sentences=2)))
+    return facts
+
+
+def synthetic_document(n_paragraphs, seed=42):
+    """Texto de documento com parágrafos separados por linha em branco, como o texto extraído de um PDF."""
+    rng = random.Random(seed)
+    return "\n\n".join(
+        paragraph(rng, PORTUGUESE_WORDS if i % 2 == 0 else ENGLISH_WORDS)
+        for i in range(n_paragraphs)
+    )
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(path, pages, line_width=90):
+    """Escreve um PDF mínimo (Helvetica, WinAnsiEncoding) com uma página por texto."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Preenchido depois com a lista de páginas
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for text in pages:
+        lines = []
+        for block in text.split("\n"):
+            while len(block) > line_width:
+                cut = block.rfind(" ", 0, line_width)
+                cut = cut if cut > 0 else line_width
+                lines.append(block[:cut])
+                block = block[cut:].lstrip()
+            lines.append(block)
+        content = "BT /F1 10 Tf 12 TL 40 800 Td\n" + "".join(
+            f"({_pdf_escape(line)}) Tj T*\n" for line in lines) + "ET"
+        stream = content.encode("cp1252", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as file:
+        file.write(output)
+
+
+def make_pdf_fixture(path, n_pages=10, paragraphs_per_page=6, seed=42):
+    rng = random.Random(seed)
+    pages = [synthetic_document(paragraphs_per_page, seed=rng.randrange(1 << 30)) for _ in range(n_pages)]
+    make_pdf(path, pages)
+    return path
@@ -0,0 +1,92 @@
+# benchmarks/load_test.py - Teste de carga local para /api/chat (sem dependências externas)
+#
+# Uso:
+#   python async_server.py &
+#   python benchmarks/load_test.py --concurrency 32 --duration 30
+#
+# Mantém `concurrency` clientes enviando requisições em sequência durante
+# `duration` segundos e relata latências (p50/p95/p99), vazão e a contagem
+# de respostas por status. Respostas 503 são esperadas sob sobrecarga.
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+MESSAGES = ["Olá, tudo bem?", "O que você sabe sobre café?", "Tell me about music.", "Qual o seu nome?"]
+
+
+async def post_json(host, port, path, payload):
+    body = json.dumps(payload).encode("utf-8")
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("ascii") + body
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def client(host, port, deadline, latencies, statuses, index):
+    request_number = 0
+    while time.perf_counter() < deadline:
+        message = MESSAGES[(index + request_number) % len(MESSAGES)]
+        start = time.perf_counter()
+        try:
+            status = await post_json(host, port, "/api/chat", {"message": message})
+        except OSError:
+            status = "erro de conexão"
+        elapsed = time.perf_counter() - start
+        statuses[status] += 1
+        if status == 200:
+            latencies.append(elapsed)
+        elif status == 503:
+            # Respeita o servidor em vez de insistir imediatamente
+            await asyncio.sleep(0.5)
+        request_number += 1
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float("nan")
+
+
+async def run(url, concurrency, duration):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    latencies, statuses = [], Counter()
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(client(host, port, deadline, latencies, statuses, i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "duration_s": elapsed,
+        "statuses": {str(status): count for status, count in statuses.items()},
+        "throughput_ok_per_s": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do Sonho")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=30.0)
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(args.url, concurrency, args.duration)) for concurrency in args.concurrency]
+    print(json.dumps(results, indent=4, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# benchmarks/run.py - Suíte reprodutível de benchmarks (busca, ingestão e geração)
+#
+# Uso:
+#   python benchmarks/run.py --output resultados.json
+#   python benchmarks/run.py --sizes 1000 10000 --compare resultados_anteriores.json
+#
+# Cada subsistema roda num subprocesso próprio, dentro de um diretório
+# temporário, para que o pico de RSS de um não contamine o outro e para que
+# os arquivos criados por main.py (knowledge.json, uploads/) não toquem o
+# repositório.
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+SUBSYSTEMS = ("search_knowledge", "semantic_search", "add_document", "upload_pdf", "generate_response")
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(latencies):
+    total = sum(latencies)
+    return {
+        "iterations": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "mean_ms": total / len(latencies) * 1000,
+        "throughput_per_s": len(latencies) / total if total else None,
+    }
+
+
+def timed(func, args_list):
+    latencies = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+# --- Preparação das bases sintéticas -------------------------------------
+
+def build_main_kb(size):
+    """KnowledgeBase de main.py com `size` fatos, indexada por _extract_keywords e salva uma vez."""
+    from knowledge_store import KnowledgeBase
+    from fixtures import synthetic_facts
+
+    kb = KnowledgeBase("bench_knowledge.json")
+    for topic, fact in synthetic_facts(size):
+        kb.knowledge["facts"].setdefault(topic, []).append(fact)
+        kb._extract_keywords(topic, fact)
+    kb.save_knowledge()
+    return kb
+
+
+def build_semantic_kb(size):
+    """KnowledgeBase de knowledge.py com embeddings do codificador local."""
+    import knowledge
+    from fixtures import synthetic_facts
+    from standins import HashingEncoder
+
+    encoder = HashingEncoder()
+    facts = {}
+    now = time.time()
+    for i, (topic, fact) in enumerate(synthetic_facts(size)):
+        ts = now - i
+        facts.setdefault(topic, []).append({
+            "text": fact,
+            "timestamp": str(datetime.fromtimestamp(ts)),
+            "ts": ts,
+            "embedding": encoder.encode(fact, convert_to_tensor=True).tolist(),
+        })
+    with open("bench_semantic.json", "w", encoding="utf-8") as file:
+        json.dump({"facts": facts, "relationships": {}, "vocabulary": {}}, file, ensure_ascii=False)
+    return knowledge.KnowledgeBase("bench_semantic.json", model=encoder)
+
+
+def build_chatbot(kb):
+    import main
+    from standins import CharTokenizer, tiny_causal_lm
+
+    return main.SonhoChatbot(kb, tokenizer=CharTokenizer(), model=tiny_causal_lm())
+
+
+# --- Subsistemas ---------------------------------------------------------
+
+def bench_search_knowledge(size):
+    from fixtures import QUERIES
+
+    kb = build_main_kb(size)
+    results = {}
+    for lang, queries in QUERIES.items():
+        latencies = timed(kb.search_knowledge, [(query,) for query in queries * 25])
+        results[lang] = summarize(latencies)
+    return results
+
+
+def bench_semantic_search(size):
+    from fixtures import QUERIES
+
+    kb = build_semantic_kb(size)
+    results = {}
+    for lang, queries in QUERIES.items():
+        iterations = max(3, 2000 // max(1, size // 100))
+        args = [(queries[i % len(queries)],) for i in range(iterations)]
+        results[lang] = summarize(timed(kb.semantic_search, args))
+    return results
+
+
+def bench_add_document(size):
+    from fixtures import synthetic_document
+
+    kb = build_main_kb(size)
+    documents = [(f"doc{i}.txt", synthetic_document(20, seed=i)) for i in range(5)]
+    return {"mixed": summarize(timed(kb.add_document, documents))}
+
+
+def bench_upload_pdf(size):
+    """Caminho de /api/upload (UploadStore.ingest): primeiro envio e reenvio dos mesmos PDFs."""
+    from fixtures import make_pdf_fixture
+    from upload_store import UploadStore
+
+    kb = build_main_kb(size)
+    store = UploadStore("uploads")
+    uploads = []
+    for i in range(3):
+        path = make_pdf_fixture(f"fixture{i}.pdf", n_pages=5, seed=i)
+        with open(path, "rb") as file:
+            uploads.append((file.read(), os.path.basename(path)))
+
+    def upload(data, filename):
+        store.ingest(data, filename, kb)
+
+    return {
+        "first": summarize(timed(upload, uploads)),
+        "reupload": summarize(timed(upload, uploads)),
+    }
+
+
+def bench_generate_response(size):
+    from fixtures import QUERIES
+
+    chatbot = build_chatbot(build_main_kb(size))
+    results = {}
+    for lang, queries in QUERIES.items():
+        chatbot.chat_history = ""
+        results[lang] = summarize(timed(chatbot.generate_response, [(query,) for query in queries]))
+    return results
+
+
+def run_single(subsystem, size):
+    """Executado no subprocesso: mede um subsistema e imprime o resultado em JSON."""
+    sys.path[:0] = [ROOT, BENCH_DIR]
+    start = time.perf_counter()
+    results = globals()[f"bench_{subsystem}"](size)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "subsystem": subsystem,
+        "size": size,
+        "wall_s": elapsed,
+        "peak_rss_mb": peak_kb / 1024,
+        "results": results,
+    }))
+
+
+# --- Orquestração --------------------------------------------------------
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_all(subsystems, sizes):
+    entries = []
+    for subsystem in subsystems:
+        for size in sizes:
+            print(f"> {subsystem} ({size} fatos)...", file=sys.stderr)
+            with tempfile.TemporaryDirectory() as workdir:
+                process = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--single", subsystem, str(size)],
+                    cwd=workdir, capture_output=True, text=True
+                )
+            if process.returncode != 0:
+                error = process.stderr.strip().splitlines()[-1:] or ["erro desconhecido"]
+                print(f"  falhou: {error[0]}", file=sys.stderr)
+                entries.append({"subsystem": subsystem, "size": size, "error": error[0]})
+                continue
+            entries.append(json.loads(process.stdout.strip().splitlines()[-1]))
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "entries": entries,
+    }
+
+
+def compare(current, baseline):
+    """Imprime a variação do p50 de cada medição em relação a uma execução anterior."""
+    previous = {}
+    for entry in baseline.get("entries", []):
+        for lang, stats in entry.get("results", {}).items():
+            previous[(entry["subsystem"], entry["size"], lang)] = stats
+    print(f"Comparando {current.get('commit')} com {baseline.get('commit')}")
+    for entry in current["entries"]:
+        for lang, stats in entry.get("results", {}).items():
+            old = previous.get((entry["subsystem"], entry["size"], lang))
+            if old is None:
+                continue
+            change = (stats["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0.0
+            print(f"{entry['subsystem']:18s} {entry['size']:>7d} {lang:5s} "
+                  f"p50 {old['p50_ms']:9.2f} -> {stats['p50_ms']:9.2f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do Sonho")
+    parser.add_argument("--subsystems", nargs="+", choices=SUBSYSTEMS, default=list(SUBSYSTEMS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--single", nargs=2, metavar=("SUBSISTEMA", "TAMANHO"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        run_single(args.single[0], int(args.single[1]))
+        return
+
+    report = run_all(args.subsystems, args.sizes)
+    text = json.dumps(report, indent=4, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            compare(report, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/standins.py - Substitutos locais dos modelos, para medir sem rede
+
+import hashlib
+
+
+class _Encoding(dict):
+    """Imita o BatchEncoding do transformers (acesso por atributo e por chave)."""
+
+    __getattr__ = dict.__getitem__
+
+
+class CharTokenizer:
+    """Tokenizer por caractere com a interface usada por SonhoChatbot."""
+
+    def __init__(self, vocab_size=512):
+        self.vocab_size = vocab_size
+        self.eos_token_id = 0
+        self.eos_token = "<eos>"
+        self.pad_token = None
+
+    def _encode(self, text):
+        return [1 + ord(char) % (self.vocab_size - 1) for char in text]
+
+    def __call__(self, text, return_tensors="pt", truncation=False, max_length=None, padding=False):
+        import torch
+
+        ids = self._encode(text)
+        if truncation and max_length is not None:
+            ids = ids[-max_length:]
+        input_ids = torch.tensor([ids], dtype=torch.long)
+        return _Encoding(input_ids=input_ids, attention_mask=torch.ones_like(input_ids))
+
+    def decode(self, ids, skip_special_tokens=True):
+        chars = []
+        for token in ids.tolist() if hasattr(ids, "tolist") else ids:
+            if token == self.eos_token_id and skip_special_tokens:
+                continue
+            chars.append(chr(32 + token % 95))
+        return "".join(chars)
+
+
+def tiny_causal_lm(vocab_size=512, max_positions=1280, seed=0):
+    """GPT-2 minúsculo com pesos aleatórios: mesmo caminho de código, custo previsível."""
+    import torch
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    torch.manual_seed(seed)
+    config = GPT2Config(vocab_size=vocab_size, n_positions=max_positions,
+                        n_embd=64, n_layer=2, n_head=2, eos_token_id=0, bos_token_id=0)
+    model = GPT2LMHeadModel(config)
+    model.eval()
+    return model
+
+
+class HashingEncoder:
+    """Codificador de sentenças determinístico (hashing de palavras) com a interface de SentenceTransformer."""
+
+    def __init__(self, dimensions=384):
+        self.dimensions = dimensions
+
+    def encode(self, text, convert_to_tensor=False):
+        import torch
+
+        vector = torch.zeros(self.dimensions)
+        for word in text.lower().split():
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = vector.norm()
+        if norm > 0:
+            vector = vector / norm
+        return vector if convert_to_tensor else vector.numpy()
@@ -1,9 +1,42 @@
+import ast
+import io
 import math
+import tokenize
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # O modo vetorizado é opcional
+    np = None
+
+# Nós da AST aceitos numa expressão: números, variáveis, operadores e chamadas simples
+_ALLOWED_NODES = (
+    ast.Expression, ast.Constant, ast.Name, ast.Load,
+    ast.BinOp, ast.UnaryOp, ast.Call,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod,
+    ast.UAdd, ast.USub,
+)
+
+
+def _power_to_python(expression):
+    """Troca '^' por '**' antes da análise, como numa calculadora.
+
+    A troca é feita nos tokens (e não na AST) para que '^' tenha a
+    precedência e a associatividade (à direita) da potência.
+    """
+    tokens = []
+    for token in tokenize.generate_tokens(io.StringIO(expression).readline):
+        if token.type == tokenize.OP and token.string == "^":
+            tokens.append((tokenize.OP, "**"))
+        else:
+            tokens.append((token.type, token.string))
+    return tokenize.untokenize(tokens)
+
 
 class CalculationModule:
-    def __init__(self):
+    def __init__(self, cache_size=256):
         # Inicializar operadores permitidos
-        self.allowed_operators = {"+", "-", "*", "/", "^", "%"}
+        self.allowed_operators = {"+", "-", "*", "/", "^", "%", "(", ")", ",", " "}
         self.functions = {
             "sin": math.sin,
             "cos": math.cos,
@@ -13,16 +46,28 @@ class CalculationModule:
             "exp": math.exp,
             "abs": abs
         }
+        if np is not None:
+            self.vector_functions = {
+                "sin": np.sin,
+                "cos": np.cos,
+                "tan": np.tan,
+                "sqrt": np.sqrt,
+                "log": np.log,
+                "exp": np.exp,
+                "abs": np.abs
+            }
+        else:
+            self.vector_functions = {}
+
+        # Cache LRU de expressões compiladas, indexado pelo texto da expressão
+        self.compile = lru_cache(maxsize=cache_size)(self._compile)
 
     def evaluate(self, expression):
         """Avalia uma expressão matemática de forma segura."""
         try:
-            # Substituir operadores para segurança
-            sanitized_expression = self.sanitize_expression(expression)
-            
-            # Avaliar a expressão
-            result = eval(sanitized_expression, {"__builtins__": None}, self.functions)
-            return result
+            code, names = self.compile(expression)
+            self._check_variables(names, {})
+            return eval(code, {"__builtins__": None}, self.functions)
         except ZeroDivisionError:
             return "Erro: Divisão por zero."
         except Exception as e:
@@ -30,29 +75,70 @@ class CalculationModule:
 
     def sanitize_expression(self, expression):
         """Sanitiza a expressão antes de avaliar."""
-        sanitized = ""
         for char in expression:
-            if char.isdigit() or char in self.allowed_operators or char.isalpha() or char == ".":
-                sanitized += char
-            else:
+            if not (char.isdigit() or char in self.allowed_operators or char.isalpha()
+                    or char in "._"):
                 raise ValueError(f"Caractere não permitido na expressão: {char}")
-        
-        # Verificar funções matemáticas na expressão
-        for func in self.functions.keys():
-            sanitized = sanitized.replace(func, f"self.functions['{func}']")
-        
-        return sanitized
+        return expression.strip()
+
+    def _compile(self, expression):
+        """Compila a expressão para bytecode uma única vez.
+
+        Retorna o código compilado e o conjunto de variáveis livres da expressão.
+        """
+        source = _power_to_python(self.sanitize_expression(expression))
+        tree = ast.parse(source.strip(), mode="eval")
+        variables = set()
+        for node in ast.walk(tree):
+            if not isinstance(node, _ALLOWED_NODES):
+                raise ValueError(f"Construção não permitida: {type(node).__name__}")
+            if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+                raise ValueError("Apenas constantes numéricas são permitidas")
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in self.functions:
+                    raise ValueError("Função desconhecida na expressão")
+                if node.keywords:
+                    raise ValueError("Argumentos nomeados não são permitidos")
+            elif isinstance(node, ast.Name) and node.id not in self.functions:
+                variables.add(node.id)
+
+        return compile(tree, "<expressão>", "eval"), frozenset(variables)
+
+    def _check_variables(self, names, variables):
+        """Garante que toda variável livre tenha valor e que nenhuma substitua uma função."""
+        reserved = self.functions.keys() & variables.keys()
+        if reserved:
+            raise ValueError(f"Nomes reservados para funções: {', '.join(sorted(reserved))}")
+        missing = names - variables.keys()
+        if missing:
+            raise NameError(f"Variáveis sem valor: {', '.join(sorted(missing))}")
 
     def calculate_with_variables(self, expression, variables):
         """Permite calcular expressões que incluem variáveis."""
         try:
-            sanitized_expression = self.sanitize_expression(expression)
-            # Substituir variáveis na expressão
-            for var, value in variables.items():
-                sanitized_expression = sanitized_expression.replace(var, str(value))
-            
-            # Avaliar a expressão
-            result = eval(sanitized_expression, {"__builtins__": None}, self.functions)
-            return result
+            code, names = self.compile(expression)
+            self._check_variables(names, variables)
+            namespace = dict(self.functions)
+            namespace.update(variables)
+            return eval(code, {"__builtins__": None}, namespace)
+        except Exception as e:
+            return f"Erro ao calcular com variáveis: {str(e)}"
+
+    def evaluate_vectorized(self, expression, variables):
+        """Avalia uma expressão sobre arrays NumPy de valores das variáveis.
+
+        `variables` mapeia cada nome para um array (ou escalar); o resultado é
+        um array com um valor por combinação de entrada.
+        """
+        if np is None:
+            return "Erro: o modo vetorizado requer NumPy."
+        try:
+            code, names = self.compile(expression)
+            self._check_variables(names, variables)
+            namespace = dict(self.vector_functions)
+            namespace.update({name: np.asarray(value, dtype=float)
+                              for name, value in variables.items()})
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return eval(code, {"__builtins__": None}, namespace)
         except Exception as e:
-            return f"Erro ao calcular com variáveis: {str(e)}"
\ No newline at end of file
+            return f"Erro ao calcular vetorizado: {str(e)}"
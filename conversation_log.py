@@ -0,0 +1,154 @@
+# conversation_log.py - Registro de conversas em JSONL com rotação
+
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+from time_index import to_timestamp
+
+_BLOCK_SIZE = 64 * 1024
+
+
+class ConversationLog:
+    """Log de conversas somente-anexação, separado do arquivo de conhecimento.
+
+    Cada turno é uma linha JSON. O arquivo atual é rotacionado para
+    `<arquivo>.1`, `<arquivo>.2`, ... quando passa de `max_bytes` ou quando sua
+    primeira entrada é mais antiga que `max_age` segundos.
+    """
+
+    def __init__(self, file_path="conversations.jsonl", max_bytes=5 * 1024 * 1024,
+                 max_age=7 * 24 * 3600, backup_count=5):
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+        self._started_at = self._read_start_time()
+
+    def _read_start_time(self):
+        """Horário da primeira entrada do arquivo atual (ou None se vazio)."""
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as file:
+                first = file.readline()
+            return json.loads(first).get("ts") if first.strip() else None
+        except (OSError, ValueError):
+            return None
+
+    def _should_rotate(self, now):
+        try:
+            size = os.path.getsize(self.file_path)
+        except OSError:
+            return False
+        if size >= self.max_bytes:
+            return True
+        return bool(self.max_age and self._started_at and now - self._started_at >= self.max_age)
+
+    def _rotate(self):
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.file_path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.file_path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.file_path, f"{self.file_path}.1")
+        else:
+            os.remove(self.file_path)
+        self._started_at = None
+
+    def append(self, entry):
+        """Anexa um turno de conversa ao log."""
+        now = time.time()
+        record = dict(entry)
+        record.setdefault("timestamp", str(datetime.now()))
+        record["ts"] = now
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._should_rotate(now):
+                self._rotate()
+            with open(self.file_path, "a", encoding="utf-8") as file:
+                file.write(line)
+            if self._started_at is None:
+                self._started_at = now
+
+    def import_conversations(self, entries):
+        """Incorpora turnos antigos, anteriores a tudo o que já está no log.
+
+        Eles são gravados no início do arquivo mais antigo existente (o último
+        backup, ou o arquivo atual se não houver backups).
+        """
+        if not entries:
+            return
+        lines = []
+        for entry in entries:
+            record = dict(entry)
+            record.setdefault("ts", to_timestamp(record.get("timestamp")))
+            lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+        with self._lock:
+            backups = [f"{self.file_path}.{index}" for index in range(self.backup_count, 0, -1)]
+            target = next((path for path in backups if os.path.exists(path)), self.file_path)
+            tmp_path = target + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as out:
+                out.writelines(lines)
+                if os.path.exists(target):
+                    with open(target, "r", encoding="utf-8") as existing:
+                        shutil.copyfileobj(existing, out)
+            os.replace(tmp_path, target)
+            if target == self.file_path:
+                self._started_at = self._read_start_time()
+
+    def _tail_lines(self, path, count):
+        """Lê as últimas `count` linhas de um arquivo a partir do fim."""
+        try:
+            file = open(path, "rb")
+        except OSError:
+            return []
+        with file:
+            file.seek(0, os.SEEK_END)
+            position = file.tell()
+            data = b""
+            while position > 0 and data.count(b"\n") <= count:
+                step = min(_BLOCK_SIZE, position)
+                position -= step
+                file.seek(position)
+                data = file.read(step) + data
+        lines = [line for line in data.split(b"\n") if line.strip()]
+        if position > 0:
+            # A primeira linha pode estar cortada no meio do bloco
+            lines = lines[1:]
+        return lines[-count:]
+
+    def get_recent_conversations(self, count=5):
+        """Retorna os `count` turnos mais recentes, do mais antigo ao mais novo."""
+        if count <= 0:
+            return []
+        paths = [self.file_path] + [f"{self.file_path}.{i}" for i in range(1, self.backup_count + 1)]
+        lines = []
+        with self._lock:
+            for path in paths:
+                lines = self._tail_lines(path, count - len(lines)) + lines
+                if len(lines) >= count:
+                    break
+        conversations = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            record.pop("ts", None)
+            conversations.append(record)
+        return conversations
+
+
+def migrate_conversations(knowledge, conversation_log):
+    """Move a seção "conversations" de versões anteriores do arquivo de conhecimento para o log.
+
+    Retorna True se a seção existia (o conhecimento precisa ser salvo).
+    """
+    if "conversations" not in knowledge:
+        return False
+    conversation_log.import_conversations(knowledge["conversations"])
+    del knowledge["conversations"]
+    return True
@@ -0,0 +1,225 @@
+# dedup_index.py - Índice global de fatos duplicados e quase duplicados
+
+import hashlib
+import re
+import threading
+
+_WORD = re.compile(r"\w+")
+_EMPTY = -1
+
+
+def normalize(text):
+    """Forma canônica usada na comparação: minúsculas e só palavras."""
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def content_hash(text):
+    return _hash_normalized(normalize(text))
+
+
+def _hash_normalized(normalized):
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _shingle_hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class DedupIndex:
+    """Detecta fatos repetidos em toda a base, independentemente do tópico.
+
+    - Duplicatas exatas: dicionário de hashes do texto normalizado.
+    - Quase duplicatas: MinHash de permutação única (um hash por shingle,
+      distribuído em `num_bins` faixas) com LSH em bandas. Apenas os
+      candidatos que caem na mesma banda são comparados.
+
+    Inserção e consulta custam O(tamanho do texto), independentemente do
+    número de fatos já indexados. Para fatos já existentes, `from_facts`
+    indexa só os hashes exatos na carga e calcula as assinaturas numa thread
+    em segundo plano; até ela terminar, quase duplicatas desses fatos ainda
+    não são detectadas.
+    """
+
+    def __init__(self, num_bins=64, bands=16, shingle_size=3, threshold=0.8, min_words=8):
+        if num_bins % bands:
+            raise ValueError("num_bins deve ser múltiplo de bands")
+        self.num_bins = num_bins
+        self.bands = bands
+        self.rows = num_bins // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.min_words = min_words
+        self._bin_shift = 64 - (num_bins.bit_length() - 1)
+        self._value_mask = (1 << self._bin_shift) - 1
+        self._exact = {}       # hash do conteúdo -> tópicos que guardam o texto (um por cópia)
+        self._signatures = {}  # hash do conteúdo -> assinatura MinHash
+        self._buckets = {}     # (banda, valores) -> {hash do conteúdo}
+        self._unsigned = []    # (hash do conteúdo, texto) aguardando assinatura
+        self._signer = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_facts(cls, facts, **options):
+        """Índice de fatos existentes, dados como pares (tópico, texto).
+
+        Os hashes exatos são indexados de imediato; as assinaturas MinHash
+        são calculadas em segundo plano (ver `sign_pending`).
+        """
+        index = cls(**options)
+        for topic, text in facts:
+            index.add_exact(topic, text)
+        index.start_signing()
+        return index
+
+    def __len__(self):
+        return len(self._exact)
+
+    def signature(self, words):
+        """Assinatura MinHash densificada das sequências de `shingle_size` palavras."""
+        size = self.shingle_size
+        shingles = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+        signature = [_EMPTY] * self.num_bins
+        for shingle in shingles:
+            value = _shingle_hash(shingle)
+            index = value >> self._bin_shift
+            value &= self._value_mask
+            if signature[index] == _EMPTY or value < signature[index]:
+                signature[index] = value
+        # Faixas vazias copiam a próxima faixa preenchida (densificação por rotação),
+        # percorrendo as faixas de trás para frente duas vezes para dar a volta
+        bins = self.num_bins
+        filled = list(signature)
+        next_position = None
+        for position in range(2 * bins - 1, -1, -1):
+            index = position % bins
+            if filled[index] != _EMPTY:
+                next_position = position
+            elif next_position is not None and position < bins:
+                step = next_position - position
+                signature[index] = filled[next_position % bins] + step * (self._value_mask + 1)
+        return tuple(signature)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [(band, signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    def _similarity(self, first, second):
+        return sum(a == b for a, b in zip(first, second)) / self.num_bins
+
+    def _prepare(self, text):
+        """Hash do conteúdo e assinatura (None para textos curtos), calculados fora da trava."""
+        normalized = normalize(text)
+        words = normalized.split()
+        signature = self.signature(words) if len(words) >= self.min_words else None
+        return _hash_normalized(normalized), signature
+
+    def _lookup(self, key, signature):
+        if key in self._exact:
+            return "exato", self._exact[key][0]
+        if signature is None:
+            return None
+        for band_key in self._band_keys(signature):
+            for candidate in self._buckets.get(band_key, ()):
+                if self._similarity(signature, self._signatures[candidate]) >= self.threshold:
+                    return "similar", self._exact[candidate][0]
+        return None
+
+    def _insert(self, topic, key, signature):
+        self._exact[key] = [topic]
+        if signature is None:
+            return
+        self._signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def find_duplicate(self, text):
+        """Retorna (tipo, tópico) do fato existente equivalente, ou None.
+
+        `tipo` é "exato" ou "similar".
+        """
+        key, signature = self._prepare(text)
+        with self._lock:
+            return self._lookup(key, signature)
+
+    def add(self, topic, text):
+        """Indexa um fato existente; cópias repetidas do mesmo texto são contadas."""
+        key, signature = self._prepare(text)
+        with self._lock:
+            if key in self._exact:
+                self._exact[key].append(topic)
+            else:
+                self._insert(topic, key, signature)
+
+    def add_exact(self, topic, text):
+        """Indexa o hash exato de um fato existente e adia o cálculo da assinatura."""
+        normalized = normalize(text)
+        key = _hash_normalized(normalized)
+        with self._lock:
+            if key in self._exact:
+                self._exact[key].append(topic)
+                return
+            self._exact[key] = [topic]
+            if normalized.count(" ") + 1 >= self.min_words:
+                self._unsigned.append((key, text))
+
+    def sign_pending(self, batch_size=16):
+        """Calcula as assinaturas adiadas por `add_exact`, em lotes.
+
+        A trava só é mantida para retirar e inserir cada lote; o cálculo, que
+        domina o custo, é feito fora dela. Retorna o número de assinaturas.
+        """
+        signed = 0
+        while True:
+            with self._lock:
+                batch = self._unsigned[-batch_size:]
+                del self._unsigned[-batch_size:]
+            if not batch:
+                return signed
+            prepared = [(key, self.signature(normalize(text).split())) for key, text in batch]
+            with self._lock:
+                for key, signature in prepared:
+                    # O fato pode ter sido removido (ou reinserido já assinado) nesse meio-tempo
+                    if key in self._exact and key not in self._signatures:
+                        self._signatures[key] = signature
+                        for band_key in self._band_keys(signature):
+                            self._buckets.setdefault(band_key, set()).add(key)
+                        signed += 1
+
+    def start_signing(self):
+        """Calcula as assinaturas pendentes numa thread em segundo plano."""
+        with self._lock:
+            if not self._unsigned or (self._signer is not None and self._signer.is_alive()):
+                return
+            self._signer = threading.Thread(target=self.sign_pending, daemon=True,
+                                            name="sonho-dedup-signatures")
+            self._signer.start()
+
+    def add_if_new(self, topic, text):
+        """Verifica e insere de forma atômica; retorna o duplicado encontrado ou None se inseriu."""
+        key, signature = self._prepare(text)
+        with self._lock:
+            duplicate = self._lookup(key, signature)
+            if duplicate is None:
+                self._insert(topic, key, signature)
+            return duplicate
+
+    def remove(self, text, topic=None):
+        """Remove uma cópia do texto; o hash só sai do índice quando não resta nenhuma."""
+        key = content_hash(text)
+        with self._lock:
+            topics = self._exact.get(key)
+            if topics is None:
+                return
+            topics.remove(topic if topic in topics else topics[-1])
+            if topics:
+                return
+            del self._exact[key]
+            signature = self._signatures.pop(key, None)
+            if signature is None:
+                return
+            for band_key in self._band_keys(signature):
+                bucket = self._buckets.get(band_key)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[band_key]
@@ -0,0 +1,146 @@
+# ingest.py - Ingestão em lote de diretórios de PDFs, sem carregar o modelo de linguagem
+#
+# Uso:
+#   python ingest.py pasta_com_pdfs/ --kb knowledge.json --workers 4
+#   python ingest.py pasta_com_pdfs/ --embeddings
+#
+# A extração de texto, a divisão em tópicos e as palavras-chave (e, com
+# --embeddings, os vetores) são calculadas em processos separados. Os
+# resultados são incorporados à base em lotes (--batch-size documentos ou
+# --batch-mb de texto), com um salvamento por lote. Arquivos cujo conteúdo já
+# foi incorporado são ignorados, então uma ingestão interrompida retoma a
+# partir do último lote salvo.
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from knowledge_store import KnowledgeBase
+from text_processing import extract_facts, extract_pdf_text
+
+DEFAULT_EMBEDDING_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_BATCH_MB = 64
+
+# Modelo de embeddings de cada processo de trabalho (só carregado com --embeddings)
+_encoder = None
+
+
+def _init_worker(embedding_model):
+    global _encoder
+    if embedding_model:
+        # Importado aqui para que transformers só seja carregado quando necessário
+        from sentence_transformers import SentenceTransformer
+        _encoder = SentenceTransformer(embedding_model)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_pdfs(directory):
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith(".pdf"):
+                yield os.path.join(root, name)
+
+
+def process_file(path, name, sha256):
+    """Executado num processo de trabalho: extrai os fatos de um PDF."""
+    with open(path, "rb") as file:
+        text = extract_pdf_text(file)
+    facts = extract_facts(text)
+    if _encoder is not None and facts:
+        vectors = _encoder.encode([fact["text"] for fact in facts])
+        for fact, vector in zip(facts, vectors):
+            fact["embedding"] = [float(value) for value in vector]
+    return {"name": name, "sha256": sha256, "text": text, "facts": facts}
+
+
+def _commit_batch(knowledge_base, batch):
+    # Ordem estável dentro do lote, independente de qual processo terminou primeiro
+    batch.sort(key=lambda document: document["name"])
+    added = knowledge_base.add_documents_bulk(batch)
+    print(f"Lote de {len(batch)} documento(s) salvo, {added} fato(s) novo(s).")
+    return added
+
+
+def ingest_directory(directory, kb_path, workers=None, embedding_model=None,
+                     batch_size=DEFAULT_BATCH_SIZE, batch_mb=DEFAULT_BATCH_MB):
+    """Processa os PDFs de `directory` em paralelo e os incorpora à base em `kb_path`.
+
+    Os documentos são salvos a cada `batch_size` documentos ou `batch_mb` MB
+    de texto, o que vier primeiro; só o lote atual fica em memória.
+    """
+    knowledge_base = KnowledgeBase(kb_path)
+
+    pending = {}
+    skipped = 0
+    for path in find_pdfs(directory):
+        sha256 = file_sha256(path)
+        if knowledge_base.is_ingested(sha256) or sha256 in pending:
+            skipped += 1
+            continue
+        pending[sha256] = (path, os.path.relpath(path, directory))
+
+    print(f"{len(pending)} arquivo(s) para processar, {skipped} já incorporado(s) ou repetido(s).")
+    if not pending:
+        return 0
+
+    batch, batch_bytes = [], 0
+    documents = added = failed = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(embedding_model,)) as executor:
+        futures = {executor.submit(process_file, path, name, sha256): name
+                   for sha256, (path, name) in pending.items()}
+        for done, future in enumerate(as_completed(futures), start=1):
+            name = futures.pop(future)
+            try:
+                document = future.result()
+                print(f"[{done}/{len(pending)}] {name}")
+            except Exception as e:
+                failed += 1
+                print(f"[{done}/{len(pending)}] {name}: erro ao processar ({e})", file=sys.stderr)
+                continue
+            batch.append(document)
+            batch_bytes += len(document["text"])
+            documents += 1
+            if len(batch) >= batch_size or batch_bytes >= batch_mb * 1024 * 1024:
+                added += _commit_batch(knowledge_base, batch)
+                batch, batch_bytes = [], 0
+
+    if batch:
+        added += _commit_batch(knowledge_base, batch)
+    print(f"{documents} documento(s) incorporado(s), {added} fato(s) novo(s), {failed} falha(s).")
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestão em lote de PDFs na base de conhecimento")
+    parser.add_argument("directory", help="diretório com os PDFs (percorrido recursivamente)")
+    parser.add_argument("--kb", default="knowledge.json", help="arquivo da base de conhecimento")
+    parser.add_argument("--workers", type=int, default=None, help="número de processos (padrão: CPUs)")
+    parser.add_argument("--embeddings", action="store_true", help="calcula embeddings dos fatos")
+    parser.add_argument("--embedding-model", default=DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="documentos por salvamento")
+    parser.add_argument("--batch-mb", type=float, default=DEFAULT_BATCH_MB,
+                        help="MB de texto por salvamento")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    ingest_directory(args.directory, args.kb, args.workers,
+                     args.embedding_model if args.embeddings else None,
+                     args.batch_size, args.batch_mb)
+    print(f"Concluído em {time.perf_counter() - start:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,83 @@
-import json
 import os
+import time
 from datetime import datetime, timedelta
 from sentence_transformers import SentenceTransformer, util
+from knowledge_loader import load_knowledge, save_knowledge
+from conversation_log import ConversationLog, migrate_conversations
+from time_index import TimeIndex, ReviewScheduler, to_timestamp
+from relationship_graph import RelationshipGraph
+from dedup_index import DedupIndex
 
 class KnowledgeBase:
-    def __init__(self, file_path):
+    def __init__(self, file_path, conversation_log_path=None, model=None):
         self.file_path = file_path
-        self.model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
+        # Qualquer objeto com encode(texto, convert_to_tensor=True) pode substituir o modelo padrão
+        self.model = model or SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
         self.knowledge = self._load_knowledge()
+        if conversation_log_path is None:
+            conversation_log_path = os.path.splitext(file_path)[0] + "_conversations.jsonl"
+        self.conversation_log = ConversationLog(conversation_log_path)
 
         # Inicializar vocabulário corretamente como dicionário
         if "vocabulary" not in self.knowledge or not isinstance(self.knowledge["vocabulary"], dict):
             self.knowledge["vocabulary"] = {}
 
+        self.time_index = self._build_time_index()
+        self.graph = RelationshipGraph.from_dict(self.knowledge["relationships"])
+        # Hashes exatos indexados já na carga; assinaturas MinHash em segundo plano
+        self.dedup_index = DedupIndex.from_facts(
+            (topic, fact["text"]) for topic, facts in self.knowledge["facts"].items() for fact in facts)
+        self.review_scheduler = None
+        # Versões anteriores guardavam as conversas no próprio arquivo de conhecimento
+        if migrate_conversations(self.knowledge, self.conversation_log):
+            self.save_knowledge()
+
     def _load_knowledge(self):
-        if os.path.exists(self.file_path):
-            try:
-                with open(self.file_path, 'r', encoding='utf-8') as file:
-                    knowledge = json.load(file)
-                    if "vocabulary" not in knowledge or not isinstance(knowledge["vocabulary"], dict):
-                        knowledge["vocabulary"] = {}
-                    return knowledge
-            except json.JSONDecodeError:
-                print("Arquivo de conhecimento corrompido. Criando novo arquivo.")
-        # Retorno padrão caso o arquivo não exista ou esteja corrompido
-        return {
+        # Carrega seção por seção; seções corrompidas são descartadas individualmente
+        knowledge = load_knowledge(self.file_path, {
             "facts": {},
-            "conversations": [],
             "last_updated": str(datetime.now()),
             "relationships": {},
             "vocabulary": {}
-        }
+        })
+        if not isinstance(knowledge["vocabulary"], dict):
+            knowledge["vocabulary"] = {}
+        return knowledge
 
     def save_knowledge(self):
         self.knowledge["last_updated"] = str(datetime.now())
-        with open(self.file_path, 'w', encoding='utf-8') as file:
-            json.dump(self.knowledge, file, ensure_ascii=False, indent=4)
+        self.knowledge["relationships"] = self.graph.to_dict()
+        save_knowledge(self.knowledge, self.file_path)
 
-    def add_fact(self, topic, information):
-        if topic not in self.knowledge["facts"]:
-            self.knowledge["facts"][topic] = []
+    def _build_time_index(self):
+        """Indexa os fatos pelo horário numérico ("ts"), convertendo entradas antigas uma única vez."""
+        entries = []
+        for topic, facts in self.knowledge["facts"].items():
+            for fact in facts:
+                if "ts" not in fact:
+                    fact["ts"] = to_timestamp(fact.get("timestamp"))
+                entries.append((fact["ts"], topic, fact["text"]))
+        return TimeIndex.from_entries(entries)
 
-        if information not in [f["text"] for f in self.knowledge["facts"][topic]]:
-            embedding = self.model.encode(information, convert_to_tensor=True).tolist()
+    def add_fact(self, topic, information):
+        # Verifica duplicatas exatas e quase idênticas em todos os tópicos e
+        # reserva o texto no índice numa única operação, segura entre threads
+        if self.dedup_index.add_if_new(topic, information) is None:
+            if topic not in self.knowledge["facts"]:
+                self.knowledge["facts"][topic] = []
+            try:
+                embedding = self.model.encode(information, convert_to_tensor=True).tolist()
+            except Exception:
+                self.dedup_index.remove(information, topic)
+                raise
+            ts = time.time()
             self.knowledge["facts"][topic].append({
                 "text": information,
-                "timestamp": str(datetime.now()),
+                "timestamp": str(datetime.fromtimestamp(ts)),
+                "ts": ts,
                 "embedding": embedding
             })
+            self.time_index.add(topic, information, ts)
             self._add_relationships(topic, information)
             self.update_vocabulary(information)
             self.save_knowledge()
@@ -67,28 +97,46 @@ class KnowledgeBase:
         return word.lower() in self.knowledge.get("vocabulary", {})
 
     def _add_relationships(self, topic, information):
+        # O peso da aresta é o número de coocorrências da palavra com o tópico
         words = [word.strip('.,') for word in information.lower().split() if len(word) > 3]
         for word in words:
             if word != topic.lower():
-                if topic not in self.knowledge["relationships"]:
-                    self.knowledge["relationships"][topic] = []
-                if word not in self.knowledge["relationships"][topic]:
-                    self.knowledge["relationships"][topic].append(word)
+                self.graph.add_edge(topic, word)
 
     def infer_relationships(self, concept):
-        return self.knowledge.get("relationships", {}).get(concept, [])
+        return self.graph.neighbors(concept)
+
+    def related_topics(self, topic, top_k=5, max_depth=None):
+        """Tópicos com fatos ligados a `topic` por um ou mais saltos no grafo.
+
+        Usa PageRank personalizado por padrão, ou BFS limitada a `max_depth` saltos.
+        """
+        facts = self.knowledge["facts"]
+        if max_depth is not None:
+            candidates = [name for name, _ in self.graph.bfs(topic, max_depth, max_nodes=top_k * 20)]
+        else:
+            candidates = [name for name, _ in self.graph.personalized_pagerank(topic, top_k=top_k * 20)]
+        return [name for name in candidates if name in facts and name != topic][:top_k]
 
     def get_facts_about(self, topic):
         return [f["text"] for f in self.knowledge["facts"].get(topic, [])]
 
-    def search_knowledge(self, query):
+    def search_knowledge(self, query, expand=False):
         results = []
+        matched_topics = []
         query = query.lower()
         for topic, facts in self.knowledge["facts"].items():
             if query in topic.lower():
                 results.extend(f"{topic}: {fact['text']}" for fact in facts)
+                matched_topics.append(topic)
             else:
                 results.extend(f"{topic}: {fact['text']}" for fact in facts if query in fact["text"].lower())
+
+        # Opcionalmente inclui fatos de tópicos relacionados no grafo
+        if expand and matched_topics:
+            for topic, _ in self.graph.personalized_pagerank(matched_topics, top_k=5):
+                if topic in self.knowledge["facts"] and topic not in matched_topics:
+                    results.extend(f"{topic}: {fact['text']}" for fact in self.knowledge["facts"][topic])
         return results
 
     def semantic_search(self, query, top_k=3):
@@ -103,40 +151,63 @@ class KnowledgeBase:
         return [res[1] for res in scored_results[:top_k]]
 
     def add_conversation(self, user_input, ai_response):
-        self.knowledge["conversations"].append({
+        self.conversation_log.append({
             "timestamp": str(datetime.now()),
             "user_input": user_input,
             "ai_response": ai_response
         })
 
-        if len(self.knowledge["conversations"]) > 100:
-            self.knowledge["conversations"] = self.knowledge["conversations"][-100:]
-
-        self.save_knowledge()
-
     def get_recent_conversations(self, count=5):
-        return self.knowledge["conversations"][-count:]
+        return self.conversation_log.get_recent_conversations(count)
 
     def get_all_topics(self):
         return list(self.knowledge["facts"].keys())
 
-    def get_old_facts(self, limit=3):
-        old_topics = []
-        now = datetime.now()
-        for topic, facts in self.knowledge["facts"].items():
-            if not facts:
-                continue
-            last_entry = facts[-1]
-            timestamp = datetime.fromisoformat(last_entry["timestamp"])
-            if now - timestamp > timedelta(days=10):
-                old_topics.append(topic)
-                if len(old_topics) >= limit:
-                    break
-        return old_topics
+    def get_old_facts(self, limit=3, max_age=timedelta(days=10)):
+        """Tópicos sem alterações há mais de `max_age`, dos mais antigos aos mais novos."""
+        return self.time_index.stale_topics(time.time() - max_age.total_seconds(), limit)
+
+    def get_facts_since(self, since):
+        """Fatos adicionados a partir de `since` (datetime ou segundos desde a época)."""
+        if isinstance(since, datetime):
+            since = since.timestamp()
+        return [{"topic": topic, "text": text, "ts": ts}
+                for ts, topic, text in self.time_index.facts_since(since)]
+
+    def expire_facts(self, ttl):
+        """Remove os fatos mais antigos que `ttl` (timedelta). Retorna quantos foram removidos."""
+        expired = self.time_index.facts_before(time.time() - ttl.total_seconds())
+        by_topic = {}
+        for ts, topic, text in expired:
+            by_topic.setdefault(topic, set()).add((ts, text))
+        for topic, entries in by_topic.items():
+            self._remove_facts(topic, lambda fact: (fact["ts"], fact["text"]) in entries)
+        if expired:
+            self.save_knowledge()
+        return len(expired)
+
+    def _remove_facts(self, topic, predicate):
+        kept = []
+        for fact in self.knowledge["facts"][topic]:
+            if predicate(fact):
+                self.time_index.remove(topic, fact["text"], fact["ts"])
+                self.dedup_index.remove(fact["text"], topic)
+            else:
+                kept.append(fact)
+        self.knowledge["facts"][topic] = kept
+        self.time_index.set_topic_time(topic, max((fact["ts"] for fact in kept), default=None))
+
+    def start_review_scheduler(self, callback, max_age=timedelta(days=10), interval=3600):
+        """Inicia a revisão periódica: `callback(tópicos)` recebe os tópicos que envelheceram."""
+        if self.review_scheduler is None:
+            self.review_scheduler = ReviewScheduler(self.time_index, max_age.total_seconds(),
+                                                    callback, interval)
+        self.review_scheduler.start()
+        return self.review_scheduler
 
     def delete_fact(self, topic, fact_text):
         if topic in self.knowledge["facts"]:
-            self.knowledge["facts"][topic] = [fact for fact in self.knowledge["facts"][topic] if fact["text"] != fact_text]
+            self._remove_facts(topic, lambda fact: fact["text"] == fact_text)
             self.save_knowledge()
             return True
         return False
\ No newline at end of file
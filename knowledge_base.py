@@ -1,22 +1,22 @@
-import json
+import os
 from datetime import datetime
+from knowledge_loader import load_knowledge, save_knowledge
+from conversation_log import ConversationLog, migrate_conversations
 
 class KnowledgeBase:
     def __init__(self, file_path="knowledge_base.json"):
         self.file_path = file_path
-        self.knowledge = {"facts": {}, "conversations": []}
+        self.knowledge = {"facts": {}}
         self.load_knowledge()
+        self.conversation_log = ConversationLog(os.path.splitext(file_path)[0] + "_conversations.jsonl")
+        if migrate_conversations(self.knowledge, self.conversation_log):
+            self.save_knowledge()
 
     def load_knowledge(self):
-        try:
-            with open(self.file_path, "r") as file:
-                self.knowledge = json.load(file)
-        except FileNotFoundError:
-            self.save_knowledge()
+        self.knowledge = load_knowledge(self.file_path, self.knowledge)
 
     def save_knowledge(self):
-        with open(self.file_path, "w") as file:
-            json.dump(self.knowledge, file, indent=4)
+        save_knowledge(self.knowledge, self.file_path)
 
     def add_fact(self, category, fact):
         if category not in self.knowledge["facts"]:
@@ -25,12 +25,11 @@ class KnowledgeBase:
         self.save_knowledge()
 
     def store_conversation(self, user_input, ai_response):
-        self.knowledge["conversations"].append({
+        self.conversation_log.append({
             "user": user_input,
             "ai": ai_response,
             "timestamp": str(datetime.now())
         })
-        self.save_knowledge()
 
     def recall_information(self, query):
         # Buscar informações relacionadas ao que foi perguntado
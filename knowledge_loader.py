@@ -0,0 +1,392 @@
+# knowledge_loader.py - Carregamento incremental do arquivo de conhecimento
+
+import json
+import mmap
+import os
+import re
+
+# Seções grandes que só são decodificadas quando acessadas
+LAZY_SECTIONS = ("documents", "conversations", "embeddings")
+
+_STRUCTURAL = re.compile(rb'["\[\]{},]')
+_KEY = re.compile(rb'"(?:[^"\\]|\\.)*"\s*:')
+_WHITESPACE = b" \t\r\n"
+_CHUNK_SIZE = 1024 * 1024
+_PENDING = object()
+
+
+class _ScanError(ValueError):
+    """Erro de varredura com a posição do byte onde ela falhou."""
+
+    def __init__(self, message, position):
+        super().__init__(message)
+        self.position = position
+
+
+class LazyKnowledge(dict):
+    """Dicionário de conhecimento cujas seções grandes são lidas sob demanda.
+
+    As seções em `LAZY_SECTIONS` ficam no disco (apenas com seus offsets) até
+    o primeiro acesso. Ao salvar, seções nunca acessadas são copiadas byte a
+    byte do arquivo antigo, sem decodificação.
+    """
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+        self._pending = {}
+        self._signature = None  # (inode, tamanho, mtime) do arquivo de onde vêm os offsets
+
+    def _open_source(self):
+        """Abre o arquivo dos offsets pendentes, ou retorna None se ele mudou desde a leitura."""
+        try:
+            file = open(self.file_path, "rb")
+        except OSError:
+            return None
+        if _file_signature(os.fstat(file.fileno())) != self._signature:
+            file.close()
+            return None
+        return file
+
+    def _reload_pending(self):
+        """Outro processo regravou o arquivo: os offsets não valem mais.
+
+        As seções pendentes são relidas e decodificadas da versão atual do
+        arquivo; seções ausentes ou corrompidas nela ficam vazias.
+        """
+        print(f"Arquivo '{self.file_path}' alterado por outro processo; relendo seções pendentes.")
+        keys = list(self._pending)
+        self._pending.clear()
+        values = {}
+        try:
+            with open(self.file_path, "rb") as file, \
+                    mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                for key, start, end in scan_sections(buf):
+                    if key in keys:
+                        try:
+                            values[key] = json.loads(buf[start:end])
+                        except ValueError as e:
+                            print(f"Seção '{key}' corrompida, será descartada: {e}")
+        except (OSError, ValueError):
+            pass
+        for key in keys:
+            dict.__setitem__(self, key, values.get(key, _empty_section(key)))
+
+    def _materialize(self, key):
+        source = self._open_source()
+        if source is None:
+            self._reload_pending()
+            return dict.__getitem__(self, key)
+        start, end = self._pending.pop(key)
+        with source:
+            try:
+                source.seek(start)
+                value = json.loads(source.read(end - start))
+            except ValueError as e:
+                print(f"Seção '{key}' corrompida, será descartada: {e}")
+                value = _empty_section(key)
+        dict.__setitem__(self, key, value)
+        return value
+
+    def is_loaded(self, key):
+        return key not in self._pending
+
+    def materialize(self):
+        """Carrega todas as seções pendentes."""
+        for key in list(self._pending):
+            self._materialize(key)
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if value is _PENDING:
+            value = self._materialize(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def pop(self, key, *args):
+        if key in self._pending:
+            self._materialize(key)
+        return dict.pop(self, key, *args)
+
+    def __setitem__(self, key, value):
+        self._pending.pop(key, None)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self._pending.pop(key, None)
+        dict.__delitem__(self, key)
+
+    def popitem(self):
+        self.materialize()
+        return dict.popitem(self)
+
+    def clear(self):
+        self._pending.clear()
+        dict.clear(self)
+
+    def items(self):
+        self.materialize()
+        return dict.items(self)
+
+    def values(self):
+        self.materialize()
+        return dict.values(self)
+
+    def copy(self):
+        self.materialize()
+        return dict(dict.items(self))
+
+    def __repr__(self):
+        return repr({key: ("<não carregado>" if key in self._pending else value)
+                     for key, value in dict.items(self)})
+
+
+def _file_signature(stat):
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _empty_section(key):
+    return [] if key == "conversations" else {}
+
+
+def _skip_whitespace(buf, pos):
+    while pos < len(buf) and buf[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def _string_end(buf, pos):
+    """Retorna a posição logo após a string JSON que começa em `pos`."""
+    pos += 1
+    while True:
+        quote = buf.find(b'"', pos)
+        if quote == -1:
+            raise _ScanError("string não terminada", len(buf))
+        # Aspas precedidas por um número ímpar de barras estão escapadas
+        backslashes = 0
+        while buf[quote - 1 - backslashes] == ord("\\"):
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return quote + 1
+        pos = quote + 1
+
+
+def _value_end(buf, pos):
+    """Encontra o fim do valor de primeiro nível que começa em `pos`.
+
+    Retorna a posição do separador (',' ou '}') que encerra o valor.
+    """
+    closers = []  # Fechamentos esperados, do mais externo ao mais interno
+    while True:
+        match = _STRUCTURAL.search(buf, pos)
+        if match is None:
+            raise _ScanError("valor não terminado", len(buf))
+        char = buf[match.start()]
+        if char == ord('"'):
+            pos = _string_end(buf, match.start())
+            continue
+        if char == ord("["):
+            closers.append(ord("]"))
+        elif char == ord("{"):
+            closers.append(ord("}"))
+        elif char in b"]}":
+            if not closers:
+                return match.start()
+            if closers.pop() != char:
+                raise _ScanError(f"'{chr(char)}' inesperado na posição {match.start()}", match.start())
+        elif not closers:
+            return match.start()
+        pos = match.end()
+
+
+def _section_at(buf, pos):
+    """Delimita a seção `"chave": valor` em `pos`; retorna (chave, início, fim, separador)."""
+    if pos >= len(buf) or buf[pos] != ord('"'):
+        raise _ScanError(f"chave esperada na posição {pos}", pos)
+    key_end = _string_end(buf, pos)
+    try:
+        key = json.loads(buf[pos:key_end])
+    except ValueError as e:
+        raise _ScanError(f"chave inválida na posição {pos}: {e}", key_end)
+    pos = _skip_whitespace(buf, key_end)
+    if pos >= len(buf) or buf[pos] != ord(":"):
+        raise _ScanError(f"':' esperado na posição {pos}", pos)
+    start = _skip_whitespace(buf, pos + 1)
+    end = _value_end(buf, start)
+    if buf[end] not in b",}":
+        raise _ScanError(f"'{chr(buf[end])}' inesperado na posição {end}", end)
+    value_end = end
+    while value_end > start and buf[value_end - 1] in _WHITESPACE:
+        value_end -= 1
+    return key, start, value_end, end
+
+
+def _scan_from(buf, pos, sections):
+    """Acrescenta a `sections` as seções a partir de `pos`; retorna a posição após o '}' final."""
+    while True:
+        pos = _skip_whitespace(buf, pos)
+        if pos < len(buf) and buf[pos] == ord("}"):
+            return pos + 1
+        key, start, value_end, end = _section_at(buf, pos)
+        sections.append((key, start, value_end))
+        if buf[end] == ord("}"):
+            return end + 1
+        pos = end + 1
+
+
+def _resync(buf, pos):
+    """Procura, depois de `pos`, a próxima chave de primeiro nível.
+
+    Uma chave candidata só é aceita se as seções a partir dela se estendem
+    corretamente até o '}' que encerra o arquivo. Quando uma candidata
+    aninhada termina antes do fim, as chaves até ali estão no mesmo objeto
+    e são puladas; quando ela falha, as chaves até o ponto da falha levariam
+    ao mesmo erro e a busca continua depois dele. Assim cada byte é
+    varrido um número limitado de vezes.
+    """
+    search = pos + 1
+    while True:
+        candidate = _KEY.search(buf, search)
+        if candidate is None:
+            return None
+        try:
+            end = _scan_from(buf, candidate.start(), [])
+        except _ScanError as e:
+            search = max(e.position, candidate.end())
+            continue
+        if _skip_whitespace(buf, end) >= len(buf):
+            return candidate.start()
+        search = max(end, candidate.end())
+
+
+def scan_sections(buf):
+    """Lista as seções de primeiro nível como (chave, início, fim) sem decodificá-las.
+
+    Se uma seção não puder ser delimitada (ex.: colchete trocado), ela é
+    descartada e a varredura continua na próxima chave de primeiro nível.
+    Levanta ValueError se o arquivo não for um objeto JSON.
+    """
+    sections = []
+    pos = _skip_whitespace(buf, 0)
+    if pos >= len(buf) or buf[pos] != ord("{"):
+        raise ValueError("o arquivo não começa com '{'")
+    pos += 1
+    while True:
+        pos = _skip_whitespace(buf, pos)
+        if pos >= len(buf) or buf[pos] == ord("}"):
+            break
+        try:
+            key, start, value_end, end = _section_at(buf, pos)
+        except ValueError as e:
+            resume = _resync(buf, pos)
+            print(f"Trecho ilegível no arquivo de conhecimento ({e}); "
+                  + ("retomando na próxima seção." if resume is not None else "restante descartado."))
+            if resume is None:
+                break
+            pos = resume
+            continue
+        sections.append((key, start, value_end))
+        if buf[end] == ord("}"):
+            break
+        pos = end + 1
+    return sections
+
+
+def load_knowledge(file_path, default):
+    """Carrega o arquivo de conhecimento seção por seção.
+
+    As seções em `LAZY_SECTIONS` só são lidas quando acessadas. Seções
+    corrompidas são descartadas individualmente e substituídas pelos valores
+    de `default`, preservando o restante do arquivo.
+    """
+    knowledge = LazyKnowledge(file_path)
+    if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+        with open(file_path, "rb") as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            knowledge._signature = _file_signature(os.fstat(file.fileno()))
+            try:
+                sections = scan_sections(buf)
+            except ValueError:
+                print("Arquivo corrompido. Criando novo.")
+                sections = []
+            for key, start, end in sections:
+                if key in LAZY_SECTIONS:
+                    knowledge._pending[key] = (start, end)
+                    dict.__setitem__(knowledge, key, _PENDING)
+                    continue
+                try:
+                    knowledge[key] = json.loads(buf[start:end])
+                except ValueError as e:
+                    print(f"Seção '{key}' corrompida, será descartada: {e}")
+
+    for key, value in default.items():
+        if key not in knowledge:
+            knowledge[key] = value
+    return knowledge
+
+
+def save_knowledge(knowledge, file_path):
+    """Grava o conhecimento de forma atômica, no mesmo formato de `json.dump(indent=4)`.
+
+    Seções ainda não carregadas de um `LazyKnowledge` são copiadas diretamente
+    do arquivo anterior, desde que ele não tenha sido alterado desde a
+    leitura; caso contrário elas são relidas e gravadas decodificadas.
+    """
+    pending = getattr(knowledge, "_pending", {})
+    tmp_path = f"{file_path}.tmp"
+    new_spans = {}
+    source = None
+    if pending:
+        source = knowledge._open_source()
+        if source is None:
+            knowledge._reload_pending()
+    try:
+        with open(tmp_path, "wb") as out:
+            if not dict.__len__(knowledge):
+                out.write(b"{}")
+            else:
+                out.write(b"{")
+                for index, key in enumerate(dict.keys(knowledge)):
+                    out.write(b",\n    " if index else b"\n    ")
+                    out.write(json.dumps(key, ensure_ascii=False).encode("utf-8") + b": ")
+                    if key in pending:
+                        start, end = pending[key]
+                        new_start = out.tell()
+                        source.seek(start)
+                        remaining = end - start
+                        while remaining > 0:
+                            chunk = source.read(min(_CHUNK_SIZE, remaining))
+                            if not chunk:
+                                break
+                            out.write(chunk)
+                            remaining -= len(chunk)
+                        new_spans[key] = (new_start, out.tell())
+                    else:
+                        text = json.dumps(knowledge[key], ensure_ascii=False, indent=4)
+                        out.write(text.replace("\n", "\n    ").encode("utf-8"))
+                out.write(b"\n}")
+            out.flush()
+            signature = _file_signature(os.fstat(out.fileno()))
+    finally:
+        if source is not None:
+            source.close()
+    os.replace(tmp_path, file_path)
+
+    if isinstance(knowledge, LazyKnowledge):
+        knowledge.file_path = file_path
+        knowledge._pending.update(new_spans)
+        knowledge._signature = signature
@@ -0,0 +1,336 @@
+# knowledge_store.py - Base de conhecimento usada pela aplicação principal (main.py)
+
+import heapq
+import os
+import threading
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from datetime import datetime
+import nltk
+from knowledge_loader import load_knowledge, save_knowledge
+from conversation_log import ConversationLog, migrate_conversations
+from dedup_index import DedupIndex, content_hash
+from metrics import timed
+from text_processing import extract_keywords, extract_topics_from_document
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ReadWriteLock:
+    """Vários leitores ao mesmo tempo ou um único escritor.
+
+    Escritores aguardando têm preferência sobre novos leitores, para que
+    buscas contínuas não impeçam o aprendizado. Não é reentrante.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class WordCounts:
+    """Ocorrências de cada palavra somadas entre várias bases (ex.: shards).
+
+    Cada base incrementa a contagem ao indexar palavras-chave; as buscas leem
+    `get` sem travar, como num dicionário comum.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.counts)
+
+    def get(self, word, default=None):
+        return self.counts.get(word, default)
+
+    def add(self, word, amount=1):
+        with self._lock:
+            self.counts[word] = self.counts.get(word, 0) + amount
+
+
+# Classe de Base de Conhecimento
+class KnowledgeBase:
+    def __init__(self, file_path='knowledge.json', conversation_log_path=None, dedup_index=None,
+                 shared_counts=None):
+        self.file_path = file_path
+        # Buscas e estatísticas leem a base; fatos e documentos novos a alteram
+        self.lock = ReadWriteLock()
+        self.knowledge = self._load_knowledge()
+        # As conversas ficam num log próprio, fora do arquivo de conhecimento
+        if conversation_log_path is None:
+            conversation_log_path = os.path.splitext(file_path)[0] + "_conversations.jsonl"
+        self.conversation_log = ConversationLog(conversation_log_path)
+        # Versões anteriores guardavam as conversas no próprio arquivo de conhecimento
+        if migrate_conversations(self.knowledge, self.conversation_log):
+            self.save_knowledge()
+        # Um índice compartilhado (ex.: entre shards) pode ser fornecido; senão os hashes
+        # exatos são indexados já na carga e as assinaturas MinHash em segundo plano
+        if dedup_index is None:
+            dedup_index = DedupIndex.from_facts(
+                (topic, fact) for topic, facts in self.knowledge["facts"].items() for fact in facts)
+        self.dedup_index = dedup_index
+        # Contagens de palavras de todas as bases que compartilham a busca (ver ShardedKnowledgeBase)
+        self.shared_counts = shared_counts
+        # Trigramas dos nomes de tópicos, para a busca por trecho do tópico (construído na primeira busca)
+        self._topic_grams = None
+        self._max_topic_length = 0
+        self._index_lock = threading.Lock()
+
+    def _load_knowledge(self):
+        # Carrega seção por seção; documentos e conversas só quando acessados
+        knowledge = load_knowledge(self.file_path, self._create_empty_knowledge())
+
+        # Garante a estrutura correta
+        if "vocabulary" not in knowledge:
+            knowledge["vocabulary"] = {}
+
+        # A busca percorre as listas de tópicos de cada palavra em ordem alfabética
+        for entry in knowledge["vocabulary"].values():
+            entry["topics"].sort()
+            
+        return knowledge
+
+    def _create_empty_knowledge(self):
+        return {
+            "facts": {},
+            "documents": {},
+            "last_updated": str(datetime.now()),
+            "vocabulary": {}
+        }
+
+    def save_knowledge(self):
+        # O salvamento grava um .tmp compartilhado e atualiza os offsets das seções
+        # pendentes, então precisa da trava exclusiva, como add_fact
+        with self.lock.write():
+            self._save()
+
+    @timed("save_knowledge")
+    def _save(self):
+        # Chamado com a trava já adquirida
+        save_knowledge(self.knowledge, self.file_path)
+
+    def add_fact(self, topic, information):
+        with self.lock.write():
+            if self._insert_fact(topic, information):
+                self._save()
+                return True
+            return False
+
+    @timed("add_fact")
+    def _insert_fact(self, topic, information, keywords=None):
+        """Insere o fato sem salvar (com a trava de escrita adquirida); retorna False se ele (ou um quase idêntico) já existir."""
+        topic = topic.lower().strip()
+
+        # Verifica se a informação (ou uma quase idêntica) já existe em qualquer tópico
+        if self.dedup_index.add_if_new(topic, information) is not None:
+            return False
+        facts = self.knowledge["facts"]
+        if topic not in facts:
+            facts[topic] = []
+            if self._topic_grams is not None:
+                self._index_topic(self._topic_grams, topic)
+        facts[topic].append(information)
+        if keywords is None:
+            self._extract_keywords(topic, information)
+        else:
+            self._index_keywords(topic, keywords)
+        return True
+
+    def _extract_keywords(self, topic, text):
+        # Tokeniza e processa o texto para extrair palavras-chave
+        self._index_keywords(topic, extract_keywords(text))
+
+    def _index_keywords(self, topic, meaningful_words):
+        # Adiciona ao vocabulário, mantendo os tópicos de cada palavra ordenados
+        for word in meaningful_words:
+            if word not in self.knowledge["vocabulary"]:
+                self.knowledge["vocabulary"][word] = {"topics": [], "count": 0}
+
+            topics = self.knowledge["vocabulary"][word]["topics"]
+            position = bisect_left(topics, topic)
+            if position == len(topics) or topics[position] != topic:
+                topics.insert(position, topic)
+            
+            self.knowledge["vocabulary"][word]["count"] += 1
+            if self.shared_counts is not None:
+                self.shared_counts.add(word)
+
+    def _index_topic(self, grams, topic):
+        for gram in _trigrams(topic):
+            insort(grams.setdefault(gram, []), topic)
+        self._max_topic_length = max(self._max_topic_length, len(topic))
+
+    def _topic_index(self):
+        """Trigramas dos nomes de tópicos -> lista ordenada dos tópicos que os contêm."""
+        if self._topic_grams is None:
+            with self._index_lock:
+                if self._topic_grams is None:
+                    grams = {}
+                    for topic in sorted(self.knowledge["facts"]):
+                        for gram in _trigrams(topic):
+                            grams.setdefault(gram, []).append(topic)
+                        self._max_topic_length = max(self._max_topic_length, len(topic))
+                    self._topic_grams = grams
+        return self._topic_grams
+
+    def _topics_containing(self, query):
+        """Tópicos cujo nome contém `query`, em ordem alfabética e sob demanda."""
+        grams = self._topic_index()
+        if len(query) > self._max_topic_length:
+            return []
+        if len(query) < 3:
+            # Consultas curtas demais para os trigramas: percorre os tópicos
+            return sorted(topic for topic in self.knowledge["facts"] if query in topic)
+        # Filtra a lista do trigrama mais raro; a busca para ao completar top_k
+        shortest = min((grams.get(gram, []) for gram in _trigrams(query)), key=len)
+        return (topic for topic in shortest if query in topic)
+
+    def search_knowledge(self, query, top_k=5):
+        query = query.lower().strip()
+        return self.search_tokens(query, nltk.word_tokenize(query), top_k)
+
+    def search_tokens(self, query, words, top_k=5, word_counts=None):
+        """Busca com a consulta já normalizada e tokenizada.
+
+        A pontuação de um fato é 10 se `query` aparece no nome do tópico, ou o
+        número de ocorrências da palavra da consulta que leva ao tópico (a
+        maior delas). `word_counts` (qualquer objeto com `get`) substitui essas
+        contagens (ex.: totais de todos os shards). Empates são desfeitos pelo nome do tópico e pela
+        ordem dos fatos, então o resultado não depende da ordem de inserção.
+        """
+        with self.lock.read():
+            return self._search(query, words, top_k, {} if word_counts is None else word_counts)
+
+    def _search(self, query, words, top_k, word_counts):
+        # Agrupa as listas ordenadas de tópicos por pontuação
+        levels = {10: [self._topics_containing(query)]}
+        vocabulary = self.knowledge["vocabulary"]
+        for word in dict.fromkeys(words):
+            if word in vocabulary:
+                score = word_counts.get(word, vocabulary[word]["count"])
+                levels.setdefault(score, []).append(vocabulary[word]["topics"])
+
+        # Percorre as pontuações da maior para a menor, parando ao completar top_k;
+        # um tópico já visto numa pontuação maior não aparece de novo
+        facts = self.knowledge["facts"]
+        results, seen = [], set()
+        for score in sorted(levels, reverse=True):
+            for topic in heapq.merge(*levels[score]):
+                if topic in seen:
+                    continue
+                seen.add(topic)
+                for fact in facts.get(topic, [])[:top_k - len(results)]:
+                    results.append({"topic": topic, "fact": fact, "score": score})
+                if len(results) >= top_k:
+                    return results
+        return results
+
+    @timed("add_conversation")
+    def add_conversation(self, user_input, ai_response):
+        self.conversation_log.append({
+            "user": user_input,
+            "ai": ai_response,
+            "timestamp": str(datetime.now())
+        })
+
+    def get_recent_conversations(self, count=5):
+        return self.conversation_log.get_recent_conversations(count)
+
+    def stats(self):
+        """Tamanho da base, usado nas métricas."""
+        with self.lock.read():
+            return {
+                "topics": len(self.knowledge["facts"]),
+                "facts": sum(len(facts) for facts in self.knowledge["facts"].values()),
+                "vocabulary": len(self.knowledge["vocabulary"]),
+                "file_bytes": os.path.getsize(self.file_path) if os.path.exists(self.file_path) else 0,
+            }
+        
+    @timed("add_document")
+    def add_document(self, doc_name, content):
+        """Adiciona um documento à base de conhecimento"""
+        # Extrai conhecimento do documento antes de travar a base
+        topics = self._extract_topics_from_document(content)
+
+        with self.lock.write():
+            if "documents" not in self.knowledge:
+                self.knowledge["documents"] = {}
+
+            self.knowledge["documents"][doc_name] = content
+
+            # Salva uma única vez
+            for topic, facts in topics.items():
+                for fact in facts:
+                    self._insert_fact(topic, fact)
+
+            self._save()
+        return True
+
+    @timed("add_documents_bulk")
+    def add_documents_bulk(self, documents):
+        """Incorpora documentos já processados (ver ingest.py) com um único salvamento.
+
+        Cada documento é um dicionário com "name", "sha256", "text" e "facts"
+        (lista de {"topic", "text", "keywords"}, com "embedding" opcional).
+        Retorna o número de fatos novos.
+        """
+        with self.lock.write():
+            if "documents" not in self.knowledge:
+                self.knowledge["documents"] = {}
+            ingested = self.knowledge.setdefault("ingested", {})
+            added = 0
+            for document in documents:
+                self.knowledge["documents"][document["name"]] = document["text"]
+                for fact in document["facts"]:
+                    if self._insert_fact(fact["topic"], fact["text"], fact["keywords"]):
+                        added += 1
+                        if fact.get("embedding") is not None:
+                            embeddings = self.knowledge.setdefault("embeddings", {})
+                            embeddings[content_hash(fact["text"])] = fact["embedding"]
+                ingested[document["sha256"]] = document["name"]
+            self._save()
+        return added
+
+    def is_ingested(self, sha256):
+        """Indica se um arquivo com este conteúdo já foi incorporado por add_documents_bulk."""
+        with self.lock.read():
+            return sha256 in self.knowledge.get("ingested", {})
+        
+    @timed("extract_topics")
+    def _extract_topics_from_document(self, content):
+        """Extrai tópicos e fatos de um documento"""
+        return extract_topics_from_document(content)
@@ -0,0 +1,202 @@
+# metrics.py - Medição de latência por etapa e exposição no formato Prometheus
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Spans da requisição atual quando o rastreamento foi pedido (None caso contrário)
+_current_trace = ContextVar("sonho_trace", default=None)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in sorted(labels))
+    return "{" + pairs + "}"
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][index] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(key + (('le', bound),))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            lines.extend(f"{self.name}{_format_labels(key)} {value}"
+                         for key, value in sorted(self._values.items()))
+        return lines
+
+
+class Gauge:
+    """Valor instantâneo; pode ser ajustado diretamente ou calculado por uma função na coleta."""
+
+    def __init__(self, name, help_text, function=None):
+        self.name = name
+        self.help = help_text
+        self.function = function
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def render(self):
+        value = self.value
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception:
+                return []
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
+
+
+class GaugeSet:
+    """Gauges calculados juntos, com uma única chamada de `function` por coleta.
+
+    `gauges` mapeia o nome de cada métrica para (texto de ajuda, chave no
+    dicionário retornado por `function`).
+    """
+
+    def __init__(self, name, gauges, function):
+        self.name = name
+        self.gauges = dict(gauges)
+        self.function = function
+
+    def render(self):
+        try:
+            values = self.function()
+        except Exception:
+            return []
+        lines = []
+        for name, (help_text, key) in self.gauges.items():
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {values[key]}"])
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, buckets))
+
+    def counter(self, name, help_text):
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name, help_text, function=None):
+        return self._register(Gauge(name, help_text, function))
+
+    def gauge_set(self, name, gauges, function):
+        return self._register(GaugeSet(name, gauges, function))
+
+    def render(self):
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+stage_seconds = registry.histogram("sonho_stage_seconds", "Duração de cada etapa em segundos.")
+
+
+@contextmanager
+def span(stage):
+    """Mede a duração de uma etapa e a registra no histograma (e no rastreamento, se ativo)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_seconds.observe(elapsed, stage=stage)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.append((stage, elapsed))
+
+
+def start_trace():
+    """Ativa o rastreamento por requisição no contexto atual."""
+    return _current_trace.set([])
+
+
+def finish_trace(token):
+    """Encerra o rastreamento e retorna a lista de (etapa, segundos)."""
+    trace = _current_trace.get()
+    _current_trace.reset(token)
+    return trace or []
+
+
+def server_timing(trace):
+    """Formata o rastreamento como cabeçalho Server-Timing (durações em ms)."""
+    return ", ".join(f"{stage};dur={elapsed * 1000:.2f}" for stage, elapsed in trace)
+
+
+def timed(stage):
+    """Decorador equivalente a envolver a função inteira em `span(stage)`."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,142 @@
+# relationship_graph.py - Grafo de relacionamentos entre tópicos e palavras
+
+import heapq
+from collections import deque
+
+
+class RelationshipGraph:
+    """Grafo ponderado de coocorrências com nós internados como inteiros.
+
+    Cada aresta `tópico -> palavra` guarda quantas vezes a palavra apareceu
+    num fato do tópico. Para a travessia o grafo é tratado como não
+    direcionado, com a soma dos pesos nos dois sentidos.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+        self._out = []       # id -> {vizinho: peso}, arestas como foram registradas
+        self._adj = []       # id -> {vizinho: peso}, nos dois sentidos
+        self._strength = []  # id -> soma dos pesos em _adj
+        self.edge_count = 0
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def _intern(self, name):
+        node = self._ids.get(name)
+        if node is None:
+            node = len(self._names)
+            self._ids[name] = node
+            self._names.append(name)
+            self._out.append({})
+            self._adj.append({})
+            self._strength.append(0)
+        return node
+
+    def add_edge(self, source, target, weight=1):
+        """Registra (ou reforça) a relação `source -> target`."""
+        if source == target:
+            return
+        u = self._intern(source)
+        v = self._intern(target)
+        if v not in self._out[u]:
+            self.edge_count += 1
+        self._out[u][v] = self._out[u].get(v, 0) + weight
+        self._adj[u][v] = self._adj[u].get(v, 0) + weight
+        self._adj[v][u] = self._adj[v].get(u, 0) + weight
+        self._strength[u] += weight
+        self._strength[v] += weight
+
+    def neighbors(self, name):
+        """Vizinhos diretos registrados para `name`, dos mais fortes aos mais fracos."""
+        node = self._ids.get(name)
+        if node is None:
+            return []
+        ranked = sorted(self._out[node].items(), key=lambda item: item[1], reverse=True)
+        return [self._names[v] for v, _ in ranked]
+
+    def bfs(self, name, max_depth=2, max_nodes=50):
+        """Busca em largura limitada; retorna [(nome, distância)] sem o nó inicial."""
+        start = self._ids.get(name)
+        if start is None:
+            return []
+        seen = {start}
+        queue = deque([(start, 0)])
+        result = []
+        while queue and len(result) < max_nodes:
+            node, depth = queue.popleft()
+            if depth >= max_depth:
+                continue
+            # Vizinhos mais fortes primeiro, para que o limite corte os mais fracos
+            ranked = heapq.nlargest(max_nodes, self._adj[node].items(), key=lambda item: item[1])
+            for neighbor, _ in ranked:
+                if neighbor in seen:
+                    continue
+                seen.add(neighbor)
+                result.append((self._names[neighbor], depth + 1))
+                if len(result) >= max_nodes:
+                    break
+                queue.append((neighbor, depth + 1))
+        return result
+
+    def personalized_pagerank(self, seeds, top_k=10, alpha=0.15, epsilon=1e-4, max_pushes=10000):
+        """PageRank personalizado aproximado pelo método de push local.
+
+        O trabalho é limitado por `max_pushes` (e, na prática, por
+        1 / (alpha * epsilon)), independentemente do tamanho do grafo.
+        Retorna [(nome, pontuação)] sem os nós de origem.
+        """
+        if isinstance(seeds, str):
+            seeds = [seeds]
+        start = [self._ids[seed] for seed in seeds if seed in self._ids]
+        if not start:
+            return []
+        rank = {}
+        residual = {node: 1.0 / len(start) for node in start}
+        queue = deque(start)
+        queued = set(start)
+        pushes = 0
+        while queue and pushes < max_pushes:
+            node = queue.popleft()
+            queued.discard(node)
+            mass = residual.pop(node, 0.0)
+            strength = self._strength[node]
+            if strength == 0:
+                rank[node] = rank.get(node, 0.0) + mass
+                continue
+            rank[node] = rank.get(node, 0.0) + alpha * mass
+            spread = (1 - alpha) * mass / strength
+            for neighbor, weight in self._adj[node].items():
+                value = residual.get(neighbor, 0.0) + spread * weight
+                residual[neighbor] = value
+                if neighbor not in queued and value >= epsilon * self._strength[neighbor]:
+                    queue.append(neighbor)
+                    queued.add(neighbor)
+            pushes += 1
+
+        excluded = set(start)
+        best = heapq.nlargest(top_k, ((score, node) for node, score in rank.items()
+                                      if node not in excluded))
+        return [(self._names[node], score) for score, node in best]
+
+    def to_dict(self):
+        """Formato salvo em knowledge["relationships"]: {tópico: {palavra: peso}}."""
+        return {self._names[u]: {self._names[v]: weight for v, weight in edges.items()}
+                for u, edges in enumerate(self._out) if edges}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Aceita o formato atual e o antigo, em que cada tópico tinha uma lista de palavras."""
+        graph = cls()
+        for source, targets in (data or {}).items():
+            if isinstance(targets, dict):
+                for target, weight in targets.items():
+                    graph.add_edge(source, target, weight)
+            else:
+                for target in targets:
+                    graph.add_edge(source, target)
+        return graph
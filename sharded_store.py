@@ -0,0 +1,193 @@
+# sharded_store.py - Base de conhecimento particionada por tópico
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import nltk
+
+from dedup_index import DedupIndex
+from knowledge_loader import load_knowledge
+from knowledge_store import KnowledgeBase, WordCounts
+from metrics import timed
+from text_processing import extract_topics_from_document
+
+
+def _normalize_topic(topic):
+    return topic.lower().strip()
+
+
+class ShardedKnowledgeBase:
+    """Divide a base em `num_shards` partes pelo hash do tópico.
+
+    Cada shard é uma `KnowledgeBase` com arquivo, vocabulário e trava
+    próprios: escritas em tópicos de shards diferentes acontecem em paralelo
+    (num pool de threads) e cada salvamento regrava apenas o arquivo do
+    shard alterado. O índice de duplicatas é único e compartilhado, para que
+    fatos repetidos sejam detectados entre shards.
+
+    A busca em cada shard usa os índices ordenados da `KnowledgeBase` e custa
+    alguns microssegundos, independentemente do tamanho; por isso os shards
+    são consultados em sequência, sem o custo de despacho de um pool. As
+    palavras são pontuadas pelo total de ocorrências em todos os shards,
+    mantido numa tabela única atualizada a cada inserção, e o resultado é o
+    mesmo de uma base única com os mesmos dados.
+
+    Oferece a mesma interface pública de `KnowledgeBase`.
+    """
+
+    def __init__(self, directory='knowledge_shards', num_shards=8, workers=None, conversation_log_path=None):
+        self.directory = directory
+        self.num_shards = num_shards
+        os.makedirs(directory, exist_ok=True)
+        if conversation_log_path is None:
+            conversation_log_path = os.path.join(directory, "conversations.jsonl")
+        self.dedup_index = DedupIndex()
+        self.word_counts = WordCounts()
+        self.shards = [
+            KnowledgeBase(self.shard_path(i), conversation_log_path=conversation_log_path,
+                          dedup_index=self.dedup_index, shared_counts=self.word_counts)
+            for i in range(num_shards)
+        ]
+        self._count_words()
+        self.executor = ThreadPoolExecutor(workers or num_shards, thread_name_prefix="sonho-shard")
+        # Os fatos já existentes em todos os shards entram no índice compartilhado
+        for shard in self.shards:
+            for topic, facts in shard.knowledge["facts"].items():
+                for fact in facts:
+                    self.dedup_index.add_exact(topic, fact)
+        self.dedup_index.start_signing()
+
+    def _count_words(self):
+        """Recalcula a tabela global de contagens a partir do vocabulário dos shards."""
+        self.word_counts.counts = {}
+        for shard in self.shards:
+            for word, entry in shard.knowledge["vocabulary"].items():
+                self.word_counts.add(word, entry["count"])
+
+    def shard_path(self, index):
+        return os.path.join(self.directory, f"shard_{index:03d}.json")
+
+    def shard_for(self, key):
+        """Índice do shard de um tópico (hash estável entre execuções)."""
+        digest = hashlib.blake2b(_normalize_topic(key).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") % self.num_shards
+
+    def _on_shards(self, function, indexes=None):
+        """Executa `function(índice)` em paralelo nos shards indicados (padrão: todos)."""
+        indexes = range(self.num_shards) if indexes is None else indexes
+        futures = [self.executor.submit(function, index) for index in indexes]
+        return [future.result() for future in futures]
+
+    def save_knowledge(self):
+        self._on_shards(lambda index: self.shards[index].save_knowledge())
+
+    def add_fact(self, topic, information):
+        return self.shards[self.shard_for(topic)].add_fact(topic, information)
+
+    def search_knowledge(self, query, top_k=5):
+        query = query.lower().strip()
+        words = nltk.word_tokenize(query)
+
+        # Cada shard devolve seus melhores resultados; o top-k global está entre eles.
+        # Um tópico fica num único shard, que já devolve seus fatos em ordem.
+        results = []
+        for shard in self.shards:
+            results.extend(shard.search_tokens(query, words, top_k, self.word_counts))
+        results.sort(key=lambda item: (-item["score"], item["topic"]))
+        return results[:top_k]
+
+    # Todos os shards apontam para o mesmo log de conversas; o primeiro o administra
+    def add_conversation(self, user_input, ai_response):
+        self.shards[0].add_conversation(user_input, ai_response)
+
+    def get_recent_conversations(self, count=5):
+        return self.shards[0].get_recent_conversations(count)
+
+    def _write_facts(self, facts_by_shard, documents_by_shard=None, ingested_by_shard=None):
+        """Insere fatos (e documentos) em cada shard em paralelo, salvando cada shard uma vez."""
+        documents_by_shard = documents_by_shard or {}
+        ingested_by_shard = ingested_by_shard or {}
+        touched = set(facts_by_shard) | set(documents_by_shard) | set(ingested_by_shard)
+
+        def write(index):
+            shard = self.shards[index]
+            added = 0
+            with shard.lock.write():
+                if documents_by_shard.get(index):
+                    shard.knowledge.setdefault("documents", {}).update(documents_by_shard[index])
+                if ingested_by_shard.get(index):
+                    shard.knowledge.setdefault("ingested", {}).update(ingested_by_shard[index])
+                for fact in facts_by_shard.get(index, []):
+                    if shard._insert_fact(fact["topic"], fact["text"], fact.get("keywords")):
+                        added += 1
+                shard._save()
+            return added
+
+        return sum(self._on_shards(write, sorted(touched)))
+
+    @timed("add_document")
+    def add_document(self, doc_name, content):
+        facts_by_shard = {}
+        for topic, facts in extract_topics_from_document(content).items():
+            shard_facts = facts_by_shard.setdefault(self.shard_for(topic), [])
+            shard_facts.extend({"topic": topic, "text": fact} for fact in facts)
+        documents = {self.shard_for(doc_name): {doc_name: content}}
+        self._write_facts(facts_by_shard, documents)
+        return True
+
+    @timed("add_documents_bulk")
+    def add_documents_bulk(self, documents):
+        facts_by_shard, documents_by_shard, ingested_by_shard = {}, {}, {}
+        for document in documents:
+            documents_by_shard.setdefault(self.shard_for(document["name"]), {})[document["name"]] = document["text"]
+            ingested_by_shard.setdefault(self.shard_for(document["sha256"]), {})[document["sha256"]] = document["name"]
+            for fact in document["facts"]:
+                facts_by_shard.setdefault(self.shard_for(fact["topic"]), []).append(fact)
+        return self._write_facts(facts_by_shard, documents_by_shard, ingested_by_shard)
+
+    def is_ingested(self, sha256):
+        return self.shards[self.shard_for(sha256)].is_ingested(sha256)
+
+    def stats(self):
+        totals = {}
+        for shard_stats in self._on_shards(lambda index: self.shards[index].stats()):
+            for key, value in shard_stats.items():
+                totals[key] = totals.get(key, 0) + value
+        # Uma palavra pode estar no vocabulário de vários shards
+        totals["vocabulary"] = len(self.word_counts)
+        return totals
+
+    @classmethod
+    def from_file(cls, file_path, directory, num_shards=8):
+        """Cria uma base particionada a partir de um knowledge.json único."""
+        knowledge = load_knowledge(file_path, {"facts": {}, "vocabulary": {}, "documents": {}})
+        sharded = cls(directory, num_shards)
+        for topic, facts in knowledge["facts"].items():
+            shard = sharded.shards[sharded.shard_for(topic)]
+            shard.knowledge["facts"].setdefault(topic, []).extend(facts)
+            for fact in facts:
+                sharded.dedup_index.add_exact(topic, fact)
+        # Cada shard recebe as entradas do vocabulário que apontam para seus tópicos. A
+        # contagem é repartida proporcionalmente ao número de tópicos, preservando o total.
+        for word, entry in knowledge["vocabulary"].items():
+            topics_by_shard = {}
+            for topic in set(entry.get("topics", [])):
+                topics_by_shard.setdefault(sharded.shard_for(topic), []).append(topic)
+            count = remaining = entry.get("count", 0)
+            total_topics = sum(len(topics) for topics in topics_by_shard.values())
+            for position, (index, topics) in enumerate(sorted(topics_by_shard.items())):
+                share = remaining if position == len(topics_by_shard) - 1 else count * len(topics) // total_topics
+                remaining -= share
+                vocabulary = sharded.shards[index].knowledge["vocabulary"]
+                shard_entry = vocabulary.setdefault(word, {"topics": [], "count": 0})
+                shard_entry["topics"] = sorted(set(shard_entry["topics"]) | set(topics))
+                shard_entry["count"] += share
+        for name, content in knowledge.get("documents", {}).items():
+            sharded.shards[sharded.shard_for(name)].knowledge["documents"][name] = content
+        for sha256, name in knowledge.get("ingested", {}).items():
+            sharded.shards[sharded.shard_for(sha256)].knowledge.setdefault("ingested", {})[sha256] = name
+        sharded._count_words()
+        sharded.dedup_index.start_signing()
+        sharded.save_knowledge()
+        return sharded
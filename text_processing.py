@@ -0,0 +1,80 @@
+# text_processing.py - Extração de texto, tópicos e palavras-chave (sem dependência do modelo)
+
+from functools import lru_cache
+import nltk
+import PyPDF2
+
+# Configurar NLTK
+try:
+    nltk.data.find('tokenizers/punkt')
+except LookupError:
+    nltk.download('punkt')
+    nltk.download('stopwords')
+    nltk.download('wordnet')
+
+
+@lru_cache(maxsize=1)
+def stop_words():
+    """Stopwords em português e inglês (carregadas uma única vez)."""
+    return frozenset(nltk.corpus.stopwords.words('portuguese') +
+                     nltk.corpus.stopwords.words('english'))
+
+
+def extract_keywords(text):
+    """Palavras significativas de um texto, na ordem em que aparecem."""
+    words = nltk.word_tokenize(text.lower())
+    ignored = stop_words()
+    return [word for word in words if word not in ignored and len(word) > 2]
+
+
+def extract_topics_from_document(content):
+    """Divide o documento em parágrafos e agrupa cada um sob um tópico.
+
+    O tópico é a primeira palavra-chave (mais de 3 letras) da primeira
+    sentença do parágrafo, ou "geral" se não houver nenhuma.
+    """
+    topics = {}
+    ignored = stop_words()
+
+    # Divide o conteúdo em parágrafos
+    for paragraph in content.split('\n\n'):
+        if not paragraph.strip():
+            continue
+
+        # Usa a primeira sentença como possível indicador de tópico
+        sentences = nltk.sent_tokenize(paragraph)
+        if not sentences:
+            continue
+        words = nltk.word_tokenize(sentences[0].lower())
+        keywords = [w for w in words if w not in ignored and len(w) > 3]
+
+        topic = keywords[0] if keywords else "geral"
+        topics.setdefault(topic, []).append(paragraph)
+
+    return topics
+
+
+def extract_facts(content):
+    """Fatos de um documento no formato de add_documents_bulk: {"topic", "text", "keywords"}."""
+    facts = []
+    for topic, paragraphs in extract_topics_from_document(content).items():
+        for paragraph in paragraphs:
+            facts.append({"topic": topic, "text": paragraph, "keywords": extract_keywords(paragraph)})
+    return facts
+
+
+def extract_pdf_pages(file_stream):
+    """Texto de cada página de um PDF."""
+    pdf_reader = PyPDF2.PdfReader(file_stream)
+    return [page.extract_text() or "" for page in pdf_reader.pages]
+
+
+def extract_pdf_pages_from_path(path):
+    """Texto de cada página do PDF em `path` (usado em processos de trabalho)."""
+    with open(path, 'rb') as file:
+        return extract_pdf_pages(file)
+
+
+def extract_pdf_text(file_stream):
+    """Texto completo de um PDF, com as páginas separadas por linha em branco."""
+    return "".join(page + "\n\n" for page in extract_pdf_pages(file_stream))
@@ -0,0 +1,147 @@
+# time_index.py - Índice temporal de fatos e agendador de revisão
+
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime
+
+
+def to_timestamp(value):
+    """Converte um timestamp em texto (formato de `str(datetime.now())`) em segundos."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class TimeIndex:
+    """Mantém fatos e tópicos ordenados pelo horário da última alteração.
+
+    Duas listas ordenadas (mantidas com `bisect`) permitem consultas por
+    intervalo em O(log n + k):
+    - `(ts, tópico, texto)` para cada fato, usada em `since` e expiração;
+    - `(ts, tópico)` com a última alteração de cada tópico, usada na revisão.
+    """
+
+    def __init__(self):
+        self._facts = []
+        self._topics = []
+        self._topic_times = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Constrói o índice de uma vez a partir de tuplas `(ts, tópico, texto)`.
+
+        Ordena cada lista uma única vez, em vez de inserir fato a fato.
+        """
+        index = cls()
+        index._facts = sorted(entries)
+        for ts, topic, _ in index._facts:
+            # Em ordem crescente de ts, o último valor de cada tópico é o maior
+            index._topic_times[topic] = ts
+        index._topics = sorted((ts, topic) for topic, ts in index._topic_times.items())
+        return index
+
+    def __len__(self):
+        return len(self._facts)
+
+    def add(self, topic, text, ts):
+        with self._lock:
+            insort(self._facts, (ts, topic, text))
+            if ts >= self._topic_times.get(topic, float("-inf")):
+                self._set_topic_time(topic, ts)
+
+    def remove(self, topic, text, ts):
+        with self._lock:
+            entry = (ts, topic, text)
+            index = bisect_left(self._facts, entry)
+            if index < len(self._facts) and self._facts[index] == entry:
+                del self._facts[index]
+
+    def set_topic_time(self, topic, ts):
+        """Redefine a última alteração de um tópico (None remove o tópico do índice)."""
+        with self._lock:
+            self._set_topic_time(topic, ts)
+
+    def _set_topic_time(self, topic, ts):
+        old = self._topic_times.pop(topic, None)
+        if old is not None:
+            index = bisect_left(self._topics, (old, topic))
+            if index < len(self._topics) and self._topics[index] == (old, topic):
+                del self._topics[index]
+        if ts is not None:
+            self._topic_times[topic] = ts
+            insort(self._topics, (ts, topic))
+
+    def topic_time(self, topic):
+        return self._topic_times.get(topic)
+
+    def facts_since(self, since):
+        """Fatos alterados a partir de `since`, do mais antigo ao mais novo."""
+        with self._lock:
+            start = bisect_left(self._facts, (since,))
+            return self._facts[start:]
+
+    def facts_before(self, before):
+        """Fatos alterados antes de `before`, do mais antigo ao mais novo."""
+        with self._lock:
+            end = bisect_left(self._facts, (before,))
+            return self._facts[:end]
+
+    def stale_topics(self, before, limit=None, after=float("-inf")):
+        """Tópicos cuja última alteração está em [after, before), dos mais antigos aos mais novos."""
+        with self._lock:
+            start = bisect_left(self._topics, (after,))
+            end = bisect_left(self._topics, (before,))
+            if limit is not None:
+                end = min(end, start + limit)
+            return [topic for _, topic in self._topics[start:end]]
+
+
+class ReviewScheduler:
+    """Thread em segundo plano que sinaliza tópicos que ficaram antigos.
+
+    A cada `interval` segundos, consulta apenas a faixa do índice que
+    envelheceu desde a última verificação e chama `callback(tópicos)`.
+    """
+
+    def __init__(self, time_index, max_age, callback, interval=60.0):
+        self.time_index = time_index
+        self.max_age = max_age
+        self.callback = callback
+        self.interval = interval
+        self._cutoff = float("-inf")
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self, now=None):
+        """Retorna (e repassa ao callback) os tópicos que envelheceram desde a última chamada."""
+        now = time.time() if now is None else now
+        cutoff = now - self.max_age
+        topics = self.time_index.stale_topics(cutoff, after=self._cutoff)
+        self._cutoff = cutoff
+        if topics:
+            self.callback(topics)
+        return topics
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Erro no agendador de revisão: {e}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
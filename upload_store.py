@@ -0,0 +1,178 @@
+# upload_store.py - Armazenamento de uploads endereçado por conteúdo
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+
+from metrics import registry, span
+from text_processing import extract_facts, extract_pdf_pages
+
+cache_requests = registry.counter("sonho_cache_requests_total", "Consultas a caches, por cache e resultado (hit/miss).")
+
+
+def _page_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _write_atomic(path, data):
+    # Grava num temporário próprio e substitui, para nunca deixar um arquivo pela metade;
+    # envios simultâneos do mesmo arquivo (ou de páginas iguais) não disputam o mesmo .tmp
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _write_json(path, data):
+    _write_atomic(path, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+
+class UploadStore:
+    """Guarda cada arquivo enviado uma única vez, pelo SHA-256 do conteúdo.
+
+    Estrutura em `folder/store/`:
+    - `files/<sha256><extensão>`: o conteúdo de cada arquivo;
+    - `pages/<hash>.json`: texto extraído de cada página e os fatos que ela gerou;
+    - `manifest.json`: nome enviado -> sha256 e, por arquivo processado, as
+      páginas, o número de palavras e de fatos.
+
+    Reenviar um arquivo que a base já incorporou não repete nenhum trabalho, e
+    uma nova versão de um arquivo só extrai os fatos das páginas cujo texto não
+    foi visto antes. O cache de páginas só poupa a extração: os fatos de toda
+    página são oferecidos à base, que descarta os que já conhece, para que uma
+    base apagada ou particionada depois volte a recebê-los.
+    """
+
+    def __init__(self, folder='uploads'):
+        self.folder = folder
+        self.root = os.path.join(folder, "store")
+        self.files_dir = os.path.join(self.root, "files")
+        self.pages_dir = os.path.join(self.root, "pages")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        os.makedirs(self.files_dir, exist_ok=True)
+        os.makedirs(self.pages_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            manifest = {}
+        manifest.setdefault("names", {})
+        manifest.setdefault("files", {})
+        return manifest
+
+    def _save_manifest(self):
+        _write_json(self.manifest_path, self.manifest)
+
+    def blob_name(self, sha256, filename):
+        return sha256 + os.path.splitext(filename)[1].lower()
+
+    def blob_path(self, sha256, filename):
+        return os.path.join(self.files_dir, self.blob_name(sha256, filename))
+
+    def save(self, data, filename):
+        """Guarda o conteúdo, associa `filename` a ele e retorna o sha256."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(sha256, filename)
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+        with self._lock:
+            if self.manifest["names"].get(filename) != sha256:
+                self.manifest["names"][filename] = sha256
+                self._save_manifest()
+        return sha256
+
+    def processed(self, sha256, knowledge_base):
+        """Registro do processamento anterior do conteúdo, ou None.
+
+        O manifesto só vale se `knowledge_base` ainda tiver o arquivo incorporado.
+        """
+        with self._lock:
+            record = self.manifest["files"].get(sha256)
+        if record is not None and not knowledge_base.is_ingested(sha256):
+            record = None
+        cache_requests.inc(cache="upload", result="hit" if record else "miss")
+        return record
+
+    def resolve(self, filename):
+        """(diretório, nome do arquivo) com o conteúdo enviado como `filename`, ou None."""
+        with self._lock:
+            sha256 = self.manifest["names"].get(filename)
+        if sha256 is None:
+            return None
+        return self.files_dir, self.blob_name(sha256, filename)
+
+    def _load_page(self, page_hash):
+        try:
+            with open(os.path.join(self.pages_dir, page_hash + ".json"), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def index_pages(self, sha256, filename, pages, knowledge_base):
+        """Incorpora à base os fatos das páginas e registra o arquivo.
+
+        Páginas com texto idêntico a alguma já processada (deste ou de outro
+        arquivo) reaproveitam os fatos do cache em vez de extraí-los de novo.
+        """
+        page_hashes, all_facts, new_pages = [], [], {}
+        for text in pages:
+            page_hash = _page_hash(text)
+            page_hashes.append(page_hash)
+            cached = self._load_page(page_hash)
+            cache_requests.inc(cache="pdf_page", result="hit" if cached else "miss")
+            if cached is None:
+                with span("extract_topics"):
+                    facts = extract_facts(text)
+                new_pages[page_hash] = {"text": text, "facts": facts}
+            else:
+                facts = cached["facts"]
+            all_facts.extend(facts)
+
+        text = "".join(page + "\n\n" for page in pages)
+        document = {"name": filename, "sha256": sha256, "text": text, "facts": all_facts}
+        added = knowledge_base.add_documents_bulk([document])
+
+        # Só depois de a base salvar: uma falha antes disso não deixa páginas no cache
+        for page_hash, entry in new_pages.items():
+            _write_json(os.path.join(self.pages_dir, page_hash + ".json"), entry)
+
+        record = {
+            "name": filename,
+            "pages": page_hashes,
+            "words": len(text.split()),
+            "facts": len(all_facts),
+        }
+        with self._lock:
+            self.manifest["files"][sha256] = record
+            self._save_manifest()
+        return dict(record, changed_pages=len(new_pages), added_facts=added)
+
+    def ingest(self, data, filename, knowledge_base):
+        """Caminho síncrono completo: guarda, extrai as páginas (se preciso) e indexa."""
+        sha256 = self.save(data, filename)
+        record = self.processed(sha256, knowledge_base)
+        if record is not None:
+            return dict(record, changed_pages=0, added_facts=0)
+        with span("pdf_extract"):
+            pages = extract_pdf_pages(io.BytesIO(data))
+        return self.index_pages(sha256, filename, pages, knowledge_base)
+
+
+def describe(filename, result):
+    """Mensagem para o usuário a partir do resultado de `ingest`/`index_pages`."""
+    if not result["changed_pages"] and not result["added_facts"]:
+        return f"Arquivo '{filename}' já havia sido processado; nada de novo para aprender."
+    total = len(result["pages"])
+    return (f"Arquivo '{filename}' processado com sucesso! Aprendi {result['words']} palavras deste documento "
+            f"({result['changed_pages']} de {total} página(s) nova(s), {result['added_facts']} fato(s) novo(s)).")